@@ -0,0 +1,522 @@
+# audio_dsp.py
+import collections
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+
+# --------------------------------------------------------------------------------------
+# Voice activity detection
+# --------------------------------------------------------------------------------------
+@dataclass
+class VADConfig:
+    detector: str = "energy"  # energy | energy_zcr | spectral
+    threshold: float = 800.0  # minimum RMS (int16 units) that can count as speech
+    adaptive: bool = True  # raise the threshold above a tracked noise floor
+    snr_on: float = 3.0  # speech starts above noise_floor * snr_on
+    snr_off: float = 2.0  # ...and keeps going until below noise_floor * snr_off
+    off_ratio: float = 0.75  # release threshold relative to `threshold`
+    attack_chunks: int = 1  # consecutive voiced chunks needed to enter speech
+    silence_sec: float = 1.2  # hangover before speech is considered over
+    floor_init: float = 150.0
+    floor_min: float = 30.0
+    floor_max: float = 4000.0
+    floor_rise: float = 0.02  # per-chunk smoothing while the floor goes up (slow)
+    floor_fall: float = 0.3  # per-chunk smoothing while the floor goes down (fast)
+    zcr_max: float = 0.35  # energy_zcr/spectral: higher crossing rates are treated as noise
+    flatness_max: float = 0.5  # spectral: flatter (noise-like) spectra are rejected
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "VADConfig":
+        """
+        Reads:
+          settings["vad"]
+        """
+        try:
+            v = settings.get("vad") or {}
+            d = cls()
+            return cls(
+                detector=str(v.get("detector", d.detector)).lower(),
+                threshold=float(v.get("threshold", d.threshold)),
+                adaptive=bool(v.get("adaptive", d.adaptive)),
+                snr_on=max(1.0, float(v.get("snr_on", d.snr_on))),
+                snr_off=max(1.0, float(v.get("snr_off", d.snr_off))),
+                off_ratio=min(1.0, max(0.1, float(v.get("off_ratio", d.off_ratio)))),
+                attack_chunks=max(1, int(v.get("attack_chunks", d.attack_chunks))),
+                silence_sec=max(0.0, float(v.get("silence_sec", d.silence_sec))),
+                floor_init=float(v.get("floor_init", d.floor_init)),
+                floor_min=float(v.get("floor_min", d.floor_min)),
+                floor_max=float(v.get("floor_max", d.floor_max)),
+                floor_rise=min(1.0, max(0.0, float(v.get("floor_rise", d.floor_rise)))),
+                floor_fall=min(1.0, max(0.0, float(v.get("floor_fall", d.floor_fall)))),
+                zcr_max=float(v.get("zcr_max", d.zcr_max)),
+                flatness_max=float(v.get("flatness_max", d.flatness_max)),
+            )
+        except Exception:
+            # Safe fallback if settings are malformed
+            return cls()
+
+
+class VADDetector:
+    """
+    Second-stage check run on chunks that already pass the energy gate.
+    `frame` is a float32 view of the chunk (valid only during the call).
+    """
+
+    name = "energy"
+
+    def __init__(self, cfg: VADConfig):
+        self.cfg = cfg
+
+    def is_speech(self, frame: np.ndarray, rms: float) -> bool:
+        return True
+
+
+class EnergyZCRDetector(VADDetector):
+    """Rejects hiss/fan-like chunks whose zero-crossing rate is far above voiced speech."""
+
+    name = "energy_zcr"
+
+    def __init__(self, cfg: VADConfig):
+        super().__init__(cfg)
+        self._sign = np.empty(0, dtype=bool)
+        self._cross = np.empty(0, dtype=bool)
+
+    def zcr(self, frame: np.ndarray) -> float:
+        n = frame.shape[0]
+        if n < 2:
+            return 0.0
+        if self._sign.shape[0] < n:
+            self._sign = np.empty(n, dtype=bool)
+            self._cross = np.empty(n, dtype=bool)
+        sign = self._sign[:n]
+        cross = self._cross[: n - 1]
+        np.signbit(frame, out=sign)
+        np.not_equal(sign[1:], sign[:-1], out=cross)
+        return np.count_nonzero(cross) / (n - 1)
+
+    def is_speech(self, frame: np.ndarray, rms: float) -> bool:
+        return self.zcr(frame) <= self.cfg.zcr_max
+
+
+class SpectralFlatnessDetector(EnergyZCRDetector):
+    """ZCR check plus spectral flatness (geometric / arithmetic mean of the power spectrum)."""
+
+    name = "spectral"
+
+    def flatness(self, frame: np.ndarray) -> float:
+        power = np.abs(np.fft.rfft(frame)) ** 2 + 1e-10
+        return float(np.exp(np.mean(np.log(power))) / np.mean(power))
+
+    def is_speech(self, frame: np.ndarray, rms: float) -> bool:
+        if not super().is_speech(frame, rms):
+            return False
+        return self.flatness(frame) <= self.cfg.flatness_max
+
+
+VAD_DETECTORS: Dict[str, Callable[[VADConfig], VADDetector]] = {
+    "energy": VADDetector,
+    "energy_zcr": EnergyZCRDetector,
+    "spectral": SpectralFlatnessDetector,
+}
+
+
+class VoiceActivityDetector:
+    """
+    Streaming VAD over int16 PCM chunks.
+
+    Energy is computed on a preallocated float32 buffer (np.frombuffer + copyto + dot),
+    so a chunk costs a few vectorized passes and no per-chunk allocations. Thresholds
+    follow an adaptive noise floor (slow rise, fast fall, frozen while speaking) with
+    separate on/off levels for hysteresis; `speaking` additionally holds for
+    `silence_sec` after the last voiced chunk.
+    """
+
+    def __init__(self, cfg: Optional[VADConfig] = None, detector: Optional[VADDetector] = None):
+        self.cfg = cfg or VADConfig()
+        factory = VAD_DETECTORS.get(self.cfg.detector, VADDetector)
+        self.detector = detector or factory(self.cfg)
+        self._buf = np.empty(0, dtype=np.float32)
+        self.noise_floor = self.cfg.floor_init
+        self.rms = 0.0
+        self.voiced = False  # per-chunk decision (with on/off hysteresis)
+        self.speaking = False  # utterance state (with attack + hangover)
+        self._voiced_run = 0
+        self._silence_start: Optional[float] = None
+
+    def thresholds(self) -> tuple[float, float]:
+        cfg = self.cfg
+        on = cfg.threshold
+        off = cfg.threshold * cfg.off_ratio
+        if cfg.adaptive:
+            on = max(on, self.noise_floor * cfg.snr_on)
+            off = max(off, self.noise_floor * cfg.snr_off)
+        return on, off
+
+    def _frame(self, pcm) -> np.ndarray:
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        n = samples.shape[0]
+        if self._buf.shape[0] < n:
+            self._buf = np.empty(n, dtype=np.float32)
+        frame = self._buf[:n]
+        np.copyto(frame, samples, casting="unsafe")
+        return frame
+
+    def process(self, pcm, now: float) -> Optional[str]:
+        """
+        Feeds one chunk (bytes-like int16 mono). Returns "start" / "end" on utterance
+        edges, else None. `rms`, `voiced` and `speaking` reflect the chunk afterwards.
+        """
+        frame = self._frame(pcm)
+        n = frame.shape[0]
+        rms = math.sqrt(float(np.dot(frame, frame)) / n) if n else 0.0
+        self.rms = rms
+
+        on, off = self.thresholds()
+        level = off if self.voiced else on
+        voiced = rms > level and self.detector.is_speech(frame, rms)
+        self.voiced = voiced
+
+        cfg = self.cfg
+        if not voiced and not self.speaking:
+            # Only learn the floor from non-speech so a long utterance cannot raise it
+            rate = cfg.floor_rise if rms > self.noise_floor else cfg.floor_fall
+            self.noise_floor += (rms - self.noise_floor) * rate
+            self.noise_floor = min(cfg.floor_max, max(cfg.floor_min, self.noise_floor))
+
+        if voiced:
+            self._voiced_run += 1
+            self._silence_start = None
+            if not self.speaking and self._voiced_run >= cfg.attack_chunks:
+                self.speaking = True
+                return "start"
+            return None
+
+        self._voiced_run = 0
+        if self.speaking:
+            if self._silence_start is None:
+                self._silence_start = now
+            elif now - self._silence_start > cfg.silence_sec:
+                self.speaking = False
+                self._silence_start = None
+                return "end"
+        return None
+
+
+@dataclass
+class SilenceSuppressionConfig:
+    # Off by default: the local energy VAD can miss quiet or distant speech that the
+    # Live API's server-side VAD would pick up
+    enabled: bool = False
+    hangover_sec: float = 2.0  # keep streaming this long after the VAD utterance ends
+    preroll_ms: int = 300  # suppressed audio kept and sent ahead of a speech onset
+    keepalive_sec: float = 0.0  # >0: send one silent chunk this often while suppressed
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "SilenceSuppressionConfig":
+        """
+        Reads:
+          settings["silence_suppression"]
+        """
+        try:
+            v = settings.get("silence_suppression") or {}
+            d = cls()
+            return cls(
+                enabled=bool(v.get("enabled", d.enabled)),
+                hangover_sec=max(0.0, float(v.get("hangover_sec", d.hangover_sec))),
+                preroll_ms=min(2000, max(0, int(v.get("preroll_ms", d.preroll_ms)))),
+                keepalive_sec=max(0.0, float(v.get("keepalive_sec", d.keepalive_sec))),
+            )
+        except Exception:
+            return cls()
+
+
+class SilenceGate:
+    """
+    Decides which mic chunks go upstream, driven by a VoiceActivityDetector.
+
+    While the VAD hears speech (and for `hangover_sec` after the utterance ends, so the
+    model's own end-of-speech detection still gets trailing silence) every chunk passes.
+    After that, chunks are held in a `preroll_ms` ring instead of being sent; on the next
+    voiced chunk the ring is flushed first, so speech onsets are never clipped. With
+    `keepalive_sec` > 0 a silent chunk is sent that often while suppressed.
+    """
+
+    def __init__(self, cfg: SilenceSuppressionConfig, bytes_per_ms: float):
+        self.cfg = cfg
+        self.bytes_per_ms = float(bytes_per_ms)
+        self._preroll: collections.deque = collections.deque()
+        self._preroll_bytes = 0
+        self._last_voice: Optional[float] = None
+        self._last_sent = 0.0
+        self.suppressing = False
+        self.sent_bytes = 0
+        self.suppressed_bytes = 0
+
+    def process(self, pcm: bytes, vad: "VoiceActivityDetector", now: float) -> list:
+        """Returns the chunks (possibly none) to send for this mic chunk."""
+        if not self.cfg.enabled:
+            return self._send([pcm], now)
+        if vad.voiced or vad.speaking:
+            self._last_voice = now
+        open_ = self._last_voice is not None and now - self._last_voice <= self.cfg.hangover_sec
+        if open_:
+            out = list(self._preroll)
+            out.append(pcm)
+            self._preroll.clear()
+            self._preroll_bytes = 0
+            if self.suppressing:
+                self.suppressing = False
+                print(f"[AI DEBUG] [MIC] Upstream resumed ({len(out) - 1} pre-roll chunks).")
+            return self._send(out, now)
+
+        if not self.suppressing:
+            self.suppressing = True
+            print("[AI DEBUG] [MIC] Silence: pausing mic upstream.")
+        self._preroll.append(pcm)
+        self._preroll_bytes += len(pcm)
+        limit = self.cfg.preroll_ms * self.bytes_per_ms
+        while self._preroll and self._preroll_bytes > limit:
+            dropped = self._preroll.popleft()
+            self._preroll_bytes -= len(dropped)
+            self.suppressed_bytes += len(dropped)
+        if self.cfg.keepalive_sec and now - self._last_sent >= self.cfg.keepalive_sec:
+            return self._send([bytes(len(pcm))], now)
+        return []
+
+    def _send(self, chunks: list, now: float) -> list:
+        self._last_sent = now
+        for chunk in chunks:
+            self.sent_bytes += len(chunk)
+        return chunks
+
+
+# --------------------------------------------------------------------------------------
+# Streaming polyphase resampler
+# --------------------------------------------------------------------------------------
+_POLYPHASE_CACHE: Dict[tuple[int, int, int], tuple[int, int, np.ndarray]] = {}
+
+
+def polyphase_taps(input_rate: int, output_rate: int, taps_per_phase: int = 24) -> tuple[int, int, np.ndarray]:
+    """
+    (L, M, bank) for resampling input_rate -> output_rate by L/M. bank[phase] holds that
+    phase's taps in window order (oldest sample first), already scaled by L. The prototype
+    is a Kaiser-windowed sinc low-pass at the narrower of the two Nyquist bands, so
+    downsampling (e.g. 48k/44.1k -> 16k) is anti-aliased. Banks are cached per rate pair.
+    """
+    key = (int(input_rate), int(output_rate), int(taps_per_phase))
+    cached = _POLYPHASE_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    g = math.gcd(key[0], key[1])
+    L, M = key[1] // g, key[0] // g
+    T = key[2]
+    n = L * T
+    # Cutoff in cycles per upsampled sample, with a little margin below Nyquist
+    fc = 0.5 / max(L, M) * 0.92
+    m = np.arange(n, dtype=np.float64) - (n - 1) / 2.0
+    proto = 2.0 * fc * np.sinc(2.0 * fc * m) * np.kaiser(n, 8.0)
+    proto *= L / proto.sum()  # unity DC gain after zero-stuffing
+
+    bank = np.empty((L, T), dtype=np.float32)
+    for phase in range(L):
+        # y = sum_j h[phase + j*L] * x[i - j]; window element e holds x[i - (T - 1 - e)]
+        bank[phase] = proto[phase + (T - 1 - np.arange(T)) * L]
+    result = (L, M, bank)
+    _POLYPHASE_CACHE[key] = result
+    return result
+
+
+class StreamingResampler:
+    """
+    Stateful int16 mono resampler. Filter history and the fractional output phase carry
+    over between chunks, so consecutive chunks resample exactly like one long signal
+    (no boundary clicks). Work buffers are preallocated and reused; process() returns a
+    view into the output buffer that stays valid until the next call.
+    """
+
+    def __init__(self, input_rate: int, output_rate: int, taps_per_phase: int = 24):
+        self.input_rate = int(input_rate)
+        self.output_rate = int(output_rate)
+        self.passthrough = self.input_rate == self.output_rate
+        if self.passthrough:
+            return
+        self.L, self.M, self.bank = polyphase_taps(self.input_rate, self.output_rate, taps_per_phase)
+        self.T = self.bank.shape[1]
+        self._acc = 0  # next output position in 1/L input samples, relative to the new chunk
+        self._buf = np.zeros(self.T - 1, dtype=np.float32)  # history + current chunk
+        self._gather = np.empty((0, self.T), dtype=np.float32)
+        self._bank_rows = np.empty((0, self.T), dtype=np.float32)
+        self._out_f = np.empty(0, dtype=np.float32)
+        self._out = np.empty(0, dtype=np.int16)
+        self._steps: Dict[int, tuple[int, np.ndarray, np.ndarray]] = {}
+
+    def reset(self):
+        if not self.passthrough:
+            self._acc = 0
+            self._buf[: self.T - 1] = 0.0
+
+    def _plan(self, n_in: int) -> tuple[int, np.ndarray, np.ndarray]:
+        """Window starts and phases for a chunk of n_in samples at the current phase (cached)."""
+        key = n_in * self.L + self._acc
+        plan = self._steps.get(key)
+        if plan is None:
+            limit = n_in * self.L
+            n_out = max(0, -((self._acc - limit) // self.M))  # ceil((limit - acc) / M)
+            u = self._acc + self.M * np.arange(n_out, dtype=np.int64)
+            plan = (n_out, (u // self.L).astype(np.intp), (u % self.L).astype(np.intp))
+            if len(self._steps) < 64:
+                self._steps[key] = plan
+        return plan
+
+    def process(self, pcm) -> np.ndarray:
+        """Resamples one chunk of int16 PCM (bytes-like or array); returns an int16 view."""
+        samples = np.frombuffer(pcm, dtype=np.int16) if not isinstance(pcm, np.ndarray) else pcm
+        if self.passthrough:
+            return samples
+        n_in = samples.shape[0]
+        hist = self.T - 1
+        need = hist + n_in
+        if self._buf.shape[0] < need:
+            grown = np.zeros(need, dtype=np.float32)
+            grown[:hist] = self._buf[:hist]
+            self._buf = grown
+        buf = self._buf[:need]
+        np.copyto(buf[hist:], samples, casting="unsafe")
+
+        n_out, starts, phases = self._plan(n_in)
+        if self._out.shape[0] < n_out:
+            self._gather = np.empty((n_out, self.T), dtype=np.float32)
+            self._bank_rows = np.empty((n_out, self.T), dtype=np.float32)
+            self._out_f = np.empty(n_out, dtype=np.float32)
+            self._out = np.empty(n_out, dtype=np.int16)
+        out_f = self._out_f[:n_out]
+        if n_out:
+            item = buf.strides[0]
+            if self.L == 1:
+                # Integer decimation (48k/32k/96k -> 16k): windows are a strided view, one GEMV
+                windows = np.lib.stride_tricks.as_strided(
+                    buf[starts[0]:], shape=(n_out, self.T), strides=(self.M * item, item), writeable=False
+                )
+                np.dot(windows, self.bank[0], out=out_f)
+            else:
+                windows = np.lib.stride_tricks.as_strided(buf, shape=(need - self.T + 1, self.T), strides=(item, item), writeable=False)
+                gather = self._gather[:n_out]
+                rows = self._bank_rows[:n_out]
+                np.take(windows, starts, axis=0, out=gather)
+                np.take(self.bank, phases, axis=0, out=rows)
+                np.einsum("ij,ij->i", gather, rows, out=out_f)
+        np.clip(out_f, -32768.0, 32767.0, out=out_f)
+        np.rint(out_f, out=out_f)
+        out = self._out[:n_out]
+        np.copyto(out, out_f, casting="unsafe")
+
+        # Carry the phase and the last T-1 input samples into the next chunk
+        self._acc = self._acc + n_out * self.M - n_in * self.L
+        buf[:hist] = buf[n_in:need]
+        return out
+
+
+# --------------------------------------------------------------------------------------
+# Visualizer feed
+# --------------------------------------------------------------------------------------
+@dataclass
+class VisualizerConfig:
+    mode: str = "envelope"  # envelope | pcm | off
+    bins: int = 64  # envelope bytes per frame
+    max_fps: float = 30.0
+    floor_db: float = -60.0  # dBFS mapped to 0; 0 dBFS maps to 255
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "VisualizerConfig":
+        """
+        Reads:
+          settings["visualizer"]
+        """
+        try:
+            v = settings.get("visualizer") or {}
+            d = cls()
+            mode = str(v.get("mode", d.mode)).lower()
+            return cls(
+                mode=mode if mode in ("envelope", "pcm", "off") else d.mode,
+                bins=min(512, max(4, int(v.get("bins", d.bins)))),
+                max_fps=min(120.0, max(1.0, float(v.get("max_fps", d.max_fps)))),
+                floor_db=min(-10.0, float(v.get("floor_db", d.floor_db))),
+            )
+        except Exception:
+            return cls()
+
+
+def pcm_envelope(pcm, bins: int, floor_db: float = -60.0) -> bytes:
+    """Per-bin RMS of int16 PCM on a dB scale, one byte (0..255) per bin."""
+    x = np.frombuffer(pcm, dtype=np.int16)
+    if x.size == 0:
+        return bytes(bins)
+    per_bin = max(1, x.size // bins)
+    used = min(x.size, per_bin * bins)
+    frames = x[:used].astype(np.float32).reshape(-1, per_bin)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    db = 20.0 * np.log10(np.maximum(rms, 1.0) / 32768.0)
+    levels = np.clip((db - floor_db) * (255.0 / -floor_db), 0.0, 255.0).astype(np.uint8)
+    if levels.size < bins:
+        levels = np.pad(levels, (0, bins - levels.size))
+    return levels.tobytes()
+
+
+class VisualizerFeed:
+    """
+    Turns played PCM into Socket.IO payloads for the frontend visualizer, at most
+    `max_fps` per second.
+
+    - envelope: `bins` bytes per frame (dB-scaled RMS of the latest block); blocks that
+      arrive inside the rate cap are skipped.
+    - pcm: the raw int16 bytes; blocks inside the rate cap are batched, not dropped.
+
+    Payloads carry `data` as bytes, so python-socketio sends them as binary attachments.
+    An empty push means playback stopped and always yields a silent frame (once), so the
+    frontend level falls back to zero.
+    """
+
+    def __init__(self, cfg: VisualizerConfig, sample_rate: int):
+        self.cfg = cfg
+        self.sample_rate = int(sample_rate)
+        self.min_interval = 1.0 / cfg.max_fps
+        self._last_emit = 0.0
+        self._pending = bytearray()
+        self._silent = True
+        self.frames = 0
+        self.skipped = 0
+
+    def push(self, pcm, now: float) -> Optional[dict]:
+        mode = self.cfg.mode
+        if mode == "off":
+            return None
+        if not pcm:
+            self._pending.clear()
+            if self._silent:
+                return None
+            self._silent = True
+            self._last_emit = now
+            return self._payload(b"")
+
+        if mode == "pcm":
+            self._pending += pcm
+        if now - self._last_emit < self.min_interval:
+            self.skipped += 1
+            return None
+        self._last_emit = now
+        self._silent = False
+        if mode == "pcm":
+            data = bytes(self._pending)
+            self._pending.clear()
+            return self._payload(data)
+        return self._payload(pcm)
+
+    def _payload(self, pcm) -> dict:
+        self.frames += 1
+        if self.cfg.mode == "pcm":
+            return {"mode": "pcm", "rate": self.sample_rate, "data": bytes(pcm)}
+        return {"mode": "envelope", "data": pcm_envelope(pcm, self.cfg.bins, self.cfg.floor_db)}
@@ -0,0 +1,315 @@
+# audio_io.py
+import asyncio
+import collections
+import threading
+import time
+from typing import Optional
+
+
+class PCMRingBuffer:
+    """
+    Single-producer / single-consumer byte ring over a preallocated bytearray.
+
+    The producer only advances the write counter and the consumer only advances the
+    read counter, so no lock is needed (each counter has one writer; int stores are
+    atomic under the GIL). When full, incoming data is dropped and counted in
+    `overruns` rather than blocking the producer.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = int(capacity)
+        self._buf = bytearray(self.capacity)
+        self._view = memoryview(self._buf)
+        self._w = 0  # total bytes written (producer-owned)
+        self._r = 0  # total bytes read (consumer-owned)
+        self.overruns = 0
+        self.dropped_bytes = 0
+
+    def available(self) -> int:
+        return self._w - self._r
+
+    def free(self) -> int:
+        return self.capacity - (self._w - self._r)
+
+    def write(self, data) -> bool:
+        n = len(data)
+        if n > self.free():
+            self.overruns += 1
+            self.dropped_bytes += n
+            return False
+        start = self._w % self.capacity
+        first = min(n, self.capacity - start)
+        self._view[start:start + first] = data[:first]
+        if first < n:
+            self._view[: n - first] = data[first:]
+        self._w += n
+        return True
+
+    def read(self, n: int) -> Optional[bytes]:
+        """Returns exactly n bytes, or None if fewer are buffered."""
+        if self.available() < n:
+            return None
+        start = self._r % self.capacity
+        first = min(n, self.capacity - start)
+        if first == n:
+            out = bytes(self._view[start:start + n])
+        else:
+            out = bytes(self._view[start:]) + bytes(self._view[: n - first])
+        self._r += n
+        return out
+
+    def discard(self):
+        """Consumer-side drop of everything buffered."""
+        self._r = self._w
+
+
+class MicCaptureThread:
+    """
+    Reads a blocking PyAudio input stream on its own thread into a PCMRingBuffer and wakes
+    the event loop with call_soon_threadsafe. Mic capture no longer goes through the shared
+    default executor, so screen grabs / OCR / weather in asyncio.to_thread cannot delay it.
+    """
+
+    def __init__(
+        self,
+        stream,
+        frames_per_read: int,
+        loop: asyncio.AbstractEventLoop,
+        bytes_per_frame: int = 2,
+        buffer_chunks: int = 32,
+        read_kwargs: Optional[dict] = None,
+    ):
+        self.stream = stream
+        self.frames_per_read = int(frames_per_read)
+        self.chunk_bytes = self.frames_per_read * bytes_per_frame
+        self.loop = loop
+        self.read_kwargs = read_kwargs or {}
+        self.ring = PCMRingBuffer(self.chunk_bytes * max(4, int(buffer_chunks)))
+        self._ready = asyncio.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.error: Optional[BaseException] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="mic-capture", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        if self._thread and self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+
+    def _signal(self):
+        self._ready.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                data = self.stream.read(self.frames_per_read, **self.read_kwargs)
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                self.error = e
+                print(f"[AI DEBUG] [MIC] Capture thread read failed: {e}")
+                self._stop.wait(0.1)
+                continue
+            if not self.ring.write(data) and self.ring.overruns % 50 == 1:
+                print(f"[AI DEBUG] [MIC] Ring buffer full; dropped {self.ring.overruns} chunks so far.")
+            try:
+                self.loop.call_soon_threadsafe(self._signal)
+            except RuntimeError:
+                # Event loop closed
+                break
+
+    async def read(self) -> bytes:
+        """Next chunk_bytes of audio, waiting without blocking the loop."""
+        while True:
+            data = self.ring.read(self.chunk_bytes)
+            if data is not None:
+                return data
+            self._ready.clear()
+            # Re-check after clear so a signal between read() and clear() is not lost
+            data = self.ring.read(self.chunk_bytes)
+            if data is not None:
+                return data
+            await self._ready.wait()
+
+    def discard(self):
+        self.ring.discard()
+
+
+class PlaybackEngine:
+    """
+    Jitter-buffered audio output on a dedicated thread.
+
+    feed() appends model audio from the event loop; the output thread waits until
+    `target_ms` is buffered (or the first bytes have waited that long, so short tails are
+    not held back), then writes device-sized blocks of `device_chunk_ms`, coalescing the
+    model's small chunks into fewer, larger writes. The blocking write paces the thread.
+    Running dry and receiving more audio shortly after counts as an underrun. flush()
+    drops everything queued for barge-in; at most the block already in the device plays out.
+
+    `on_played(block)` runs on the output thread after each write (and with b"" when the
+    buffer runs dry), so taps such as the visualizer follow what is actually audible.
+    """
+
+    def __init__(
+        self,
+        write_fn,
+        sample_rate: int,
+        bytes_per_frame: int = 2,
+        target_ms: int = 120,
+        device_chunk_ms: int = 40,
+        underrun_gap_sec: float = 1.0,
+        on_underrun=None,
+        on_played=None,
+    ):
+        self.write_fn = write_fn
+        self.bytes_per_ms = sample_rate * bytes_per_frame / 1000.0
+        align = bytes_per_frame
+        self.target_bytes = int(self.bytes_per_ms * max(0, target_ms)) // align * align
+        self.block_bytes = max(align, int(self.bytes_per_ms * max(5, device_chunk_ms)) // align * align)
+        self.prime_timeout = max(0, target_ms) / 1000.0
+        self.underrun_gap_sec = underrun_gap_sec
+        self.on_underrun = on_underrun
+        self.on_played = on_played
+
+        self._chunks = collections.deque()
+        self._head_offset = 0  # bytes of _chunks[0] already consumed
+        self._buffered = 0
+        self._first_byte_ts: Optional[float] = None
+        self._dry_ts: Optional[float] = None
+        self._playing = False
+        self._flushed = False
+        self._block = bytearray(self.block_bytes)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self.error: Optional[BaseException] = None
+
+        self.underruns = 0
+        self.writes = 0
+        self.bytes_played = 0
+        self.max_depth_ms = 0.0
+
+    # --- Event loop side ---
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="audio-playback", daemon=True)
+        self._thread.start()
+
+    def feed(self, data: bytes):
+        if not data:
+            return
+        with self._cond:
+            now = time.monotonic()
+            if self._buffered == 0:
+                if self._dry_ts is not None and now - self._dry_ts < self.underrun_gap_sec:
+                    self.underruns += 1
+                    if self.on_underrun:
+                        try:
+                            self.on_underrun(self.underruns)
+                        except Exception:
+                            pass
+                self._dry_ts = None
+                if not self._playing:
+                    self._first_byte_ts = now
+            self._chunks.append(data)
+            self._buffered += len(data)
+            depth_ms = self._buffered / self.bytes_per_ms
+            if depth_ms > self.max_depth_ms:
+                self.max_depth_ms = depth_ms
+            self._cond.notify()
+
+    def flush(self) -> int:
+        """Drops all queued audio immediately; returns the number of bytes dropped."""
+        with self._cond:
+            dropped = self._buffered
+            self._chunks.clear()
+            self._head_offset = 0
+            self._buffered = 0
+            self._first_byte_ts = None
+            self._dry_ts = None
+            # The output thread still sees the buffer run dry (and reports it), but an
+            # interruption is not an underrun
+            self._flushed = True
+            return dropped
+
+    def depth_ms(self) -> float:
+        return self._buffered / self.bytes_per_ms
+
+    def close(self, timeout: Optional[float] = 1.0) -> bool:
+        """Stops the output thread; True once it has exited (the device is free to close)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is None or threading.current_thread() is self._thread:
+            return self._thread is None
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    # --- Output thread ---
+    def _take_block(self) -> Optional[memoryview]:
+        """Copies up to block_bytes from the queue into the reusable block (lock held)."""
+        n = min(self.block_bytes, self._buffered)
+        if n <= 0:
+            return None
+        filled = 0
+        while filled < n:
+            head = self._chunks[0]
+            avail = len(head) - self._head_offset
+            take = min(avail, n - filled)
+            self._block[filled:filled + take] = head[self._head_offset:self._head_offset + take]
+            filled += take
+            if take == avail:
+                self._chunks.popleft()
+                self._head_offset = 0
+            else:
+                self._head_offset += take
+        self._buffered -= n
+        return memoryview(self._block)[:n]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+                    if self._buffered > 0:
+                        if self._playing or self._buffered >= self.target_bytes:
+                            break
+                        waited = time.monotonic() - (self._first_byte_ts or 0.0)
+                        if waited >= self.prime_timeout:
+                            break
+                        self._cond.wait(self.prime_timeout - waited)
+                        continue
+                    if self._playing:
+                        self._playing = False
+                        if not self._flushed:
+                            self._dry_ts = time.monotonic()
+                        self._report_played(b"")
+                    self._flushed = False
+                    self._cond.wait()
+                self._playing = True
+                self._flushed = False
+                block = self._take_block()
+            if block is None:
+                continue
+            # bytes() because the block buffer is reused while the device may still hold it
+            data = bytes(block)
+            try:
+                self.write_fn(data)
+            except Exception as e:
+                self.error = e
+                print(f"[AI DEBUG] [AUDIO] Playback thread write failed: {e}")
+                return
+            self.writes += 1
+            self.bytes_played += len(data)
+            self._report_played(data)
+
+    def _report_played(self, data: bytes):
+        if self.on_played is None:
+            return
+        try:
+            self.on_played(data)
+        except Exception as e:
+            print(f"[AI DEBUG] [AUDIO] Playback tap failed: {e}")
@@ -0,0 +1,335 @@
+import asyncio
+import base64
+import binascii
+import collections
+import contextlib
+import multiprocessing
+import sys
+import time
+import types
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from latency import percentile
+
+STAGES = ("queue_ms", "resize_ms", "encode_ms", "total_ms")
+
+# Consecutive broken process pools before encoding moves to a thread for good
+MAX_BROKEN_POOLS = 3
+
+
+class ImagePayload(dict):
+    """
+    {"mime_type", "data"} vision payload for session.send, holding the image as given:
+    raw bytes for captured frames (no base64 copy), or a base64 string as received from
+    the frontend. `b64` and `raw` convert on first use and memoize the result, so only
+    consumers that need text (the UI) pay for base64, and only once per frame.
+    """
+
+    __slots__ = ("_raw", "_b64")
+
+    def __init__(self, mime_type: str, data):
+        if isinstance(data, (bytearray, memoryview)):
+            data = bytes(data)
+        super().__init__(mime_type=mime_type, data=data)
+        self._raw: Optional[bytes] = data if isinstance(data, bytes) else None
+        self._b64: Optional[str] = data if isinstance(data, str) else None
+
+    @property
+    def b64(self) -> str:
+        if self._b64 is None:
+            self._b64 = base64.b64encode(self._raw or b"").decode("ascii")
+        return self._b64
+
+    @property
+    def raw(self) -> Optional[bytes]:
+        """Image bytes, or None if the payload holds invalid base64."""
+        if self._raw is None and self._b64 is not None:
+            try:
+                self._raw = base64.b64decode(self._b64)
+            except (binascii.Error, ValueError):
+                return None
+        return self._raw
+
+
+# --------------------------------------------------------------------------------------
+# Worker side (runs in the pool processes)
+# --------------------------------------------------------------------------------------
+_ATTACHED: "collections.OrderedDict[str, shared_memory.SharedMemory]" = collections.OrderedDict()
+_MAX_ATTACHED = 8
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    shm = _ATTACHED.get(name)
+    if shm is not None:
+        _ATTACHED.move_to_end(name)
+        return shm
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: attaching registers the name again with the resource tracker the
+        # worker shares with the parent, which is a no-op; the parent still unlinks it
+        shm = shared_memory.SharedMemory(name=name)
+    _ATTACHED[name] = shm
+    while len(_ATTACHED) > _MAX_ATTACHED:
+        _, old = _ATTACHED.popitem(last=False)
+        old.close()
+    return shm
+
+
+def encode_frame(frame: np.ndarray, fmt: str, quality: int, max_size: Optional[int]) -> Tuple[Optional[Tuple[str, bytes]], float, float]:
+    """Optional downscale + encode; returns ((mime, bytes) or None, resize_ms, encode_ms)."""
+    t0 = time.perf_counter()
+    if max_size:
+        h, w = frame.shape[:2]
+        if h > 0 and w > 0:
+            scale = min(max_size / w, max_size / h)
+            if scale < 1.0:
+                frame = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    t1 = time.perf_counter()
+    if fmt == "png":
+        ext, mime, params = ".png", "image/png", [int(cv2.IMWRITE_PNG_COMPRESSION), 3]
+    else:
+        ext, mime, params = ".jpg", "image/jpeg", [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)]
+    ret, buf = cv2.imencode(ext, frame, params)
+    t2 = time.perf_counter()
+    result = (mime, buf.tobytes()) if ret else None
+    return result, (t1 - t0) * 1000.0, (t2 - t1) * 1000.0
+
+
+def _encode_shared(name: str, shape: tuple, fmt: str, quality: int, max_size: Optional[int]):
+    frame = np.ndarray(shape, dtype=np.uint8, buffer=_attach(name).buf)
+    return encode_frame(frame, fmt, quality, max_size)
+
+
+@contextlib.contextmanager
+def _bare_main():
+    """
+    Spawned children re-run the parent's __main__ (server.py: imports, settings, device
+    agents) as __mp_main__ before they unpickle any work. The workers only need this
+    module, so while the pool may start a process, __main__ is an empty module that spawn
+    skips.
+    """
+    main = sys.modules.get("__main__")
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        if main is not None:
+            sys.modules["__main__"] = main
+
+
+# --------------------------------------------------------------------------------------
+# Event loop side
+# --------------------------------------------------------------------------------------
+class _Job:
+    __slots__ = ("future", "slot", "frame", "shape", "fmt", "quality", "max_size", "submitted", "dispatched", "pool")
+
+    def __init__(self, future, slot, frame, shape, fmt, quality, max_size):
+        self.future = future
+        self.slot = slot
+        self.frame = frame
+        self.shape = shape
+        self.fmt = fmt
+        self.quality = quality
+        self.max_size = max_size
+        self.submitted = time.perf_counter()
+        self.dispatched = 0.0
+        self.pool = None
+
+
+class EncodeService:
+    """
+    Frame resize + JPEG/PNG encoding in a small process pool, off the threads that read
+    audio.
+
+    - submit() copies the frame once into a reusable shared-memory slot; workers map the
+      slot instead of receiving a pickled array. Only the encoded bytes come back.
+    - At most `workers` jobs run at a time and `max_pending` wait. A new job arriving at a
+      full queue drops the oldest waiting one (its future resolves to None): for live
+      video the newest frame is the one that matters.
+    - Per-stage timings (queue wait, resize, encode, end to end) are kept for stats().
+
+    If a process pool cannot be started, or MAX_BROKEN_POOLS pools in a row break (e.g.
+    workers dying at start-up), jobs run on one private thread instead (still not the
+    shared default executor). Workers use the spawn start method, which is safe with the
+    many threads this process runs.
+    """
+
+    def __init__(self, workers: int = 1, max_pending: int = 2, use_processes: bool = True, window: int = 200):
+        self.workers = max(1, int(workers))
+        self.max_pending = max(1, int(max_pending))
+        self.use_processes = bool(use_processes)
+        self._pool = None
+        self._pending: collections.deque = collections.deque()
+        self._running = 0
+        self._free_slots: List[shared_memory.SharedMemory] = []
+        self._timings: Dict[str, collections.deque] = {s: collections.deque(maxlen=window) for s in STAGES}
+        self.counters = {"submitted": 0, "completed": 0, "dropped": 0, "failed": 0}
+        self._broken_pools = 0
+        self._closed = False
+
+    # --- Pool / slots ---
+    def _ensure_pool(self):
+        if self._pool is not None:
+            return self._pool
+        if self.use_processes:
+            try:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                return self._pool
+            except Exception as e:
+                print(f"[AI DEBUG] [ENCODE] Process pool unavailable ({e}); encoding on a thread.")
+                self.use_processes = False
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="image-encode")
+        return self._pool
+
+    def _take_slot(self, nbytes: int) -> shared_memory.SharedMemory:
+        for i, shm in enumerate(self._free_slots):
+            if shm.size >= nbytes:
+                return self._free_slots.pop(i)
+        if self._free_slots:
+            # Frame size grew (e.g. a bigger monitor); replace a too-small slot
+            self._discard_slot(self._free_slots.pop())
+        return shared_memory.SharedMemory(create=True, size=max(1, nbytes))
+
+    def _release_slot(self, shm: Optional[shared_memory.SharedMemory]):
+        if shm is None:
+            return
+        if self._closed:
+            self._discard_slot(shm)
+        else:
+            self._free_slots.append(shm)
+
+    def _discard_slot(self, shm: shared_memory.SharedMemory):
+        try:
+            shm.close()
+            shm.unlink()
+        except Exception:
+            pass
+
+    # --- API ---
+    def submit(self, frame: np.ndarray, fmt: str = "jpeg", quality: int = 85, max_size: Optional[int] = None) -> asyncio.Future:
+        """Queues an encode of `frame` (copied now, so the caller may reuse its buffer)."""
+        future = asyncio.get_running_loop().create_future()
+        if self._closed:
+            future.set_result(None)
+            return future
+        self.counters["submitted"] += 1
+        pool = self._ensure_pool()
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        slot = None
+        if isinstance(pool, ProcessPoolExecutor):
+            slot = self._take_slot(frame.nbytes)
+            np.ndarray(frame.shape, dtype=np.uint8, buffer=slot.buf)[...] = frame
+            data = None
+        else:
+            data = frame.copy()
+        job = _Job(future, slot, data, frame.shape, fmt, quality, max_size)
+
+        if len(self._pending) >= self.max_pending:
+            old = self._pending.popleft()
+            self._release_slot(old.slot)
+            self.counters["dropped"] += 1
+            if not old.future.done():
+                old.future.set_result(None)
+        self._pending.append(job)
+        self._pump()
+        return future
+
+    async def encode(self, frame: np.ndarray, fmt: str = "jpeg", quality: int = 85, max_size: Optional[int] = None) -> Optional[Tuple[str, bytes]]:
+        """(mime_type, bytes), or None if the frame was dropped or failed to encode."""
+        return await self.submit(frame, fmt, quality, max_size)
+
+    def _pump(self):
+        while self._running < self.workers and self._pending:
+            job = self._pending.popleft()
+            job.dispatched = time.perf_counter()
+            self._running += 1
+            pool = self._ensure_pool()
+            job.pool = pool
+            try:
+                if job.slot is not None and isinstance(pool, ProcessPoolExecutor):
+                    # The pool starts its processes on submit
+                    with _bare_main():
+                        cf = pool.submit(_encode_shared, job.slot.name, job.shape, job.fmt, job.quality, job.max_size)
+                else:
+                    if job.slot is not None:
+                        # Queued for a process pool that has since fallen back to a thread
+                        job.frame = np.ndarray(job.shape, dtype=np.uint8, buffer=job.slot.buf).copy()
+                    cf = pool.submit(encode_frame, job.frame, job.fmt, job.quality, job.max_size)
+                done = asyncio.wrap_future(cf)
+            except Exception as e:
+                done = asyncio.get_running_loop().create_future()
+                done.set_exception(e)
+            done.add_done_callback(lambda f, job=job: self._on_done(job, f))
+
+    def _on_done(self, job: _Job, f: asyncio.Future):
+        self._running -= 1
+        self._release_slot(job.slot)
+        job.frame = None
+        result = None
+        try:
+            result, resize_ms, encode_ms = f.result()
+            now = time.perf_counter()
+            self._timings["queue_ms"].append((job.dispatched - job.submitted) * 1000.0)
+            self._timings["resize_ms"].append(resize_ms)
+            self._timings["encode_ms"].append(encode_ms)
+            self._timings["total_ms"].append((now - job.submitted) * 1000.0)
+            self.counters["completed"] += 1
+            if isinstance(job.pool, ProcessPoolExecutor):
+                self._broken_pools = 0
+        except Exception as e:
+            self.counters["failed"] += 1
+            if isinstance(e, BrokenExecutor) and job.pool is not None and job.pool is self._pool:
+                # A worker died; start a fresh pool with the next job, or give up on
+                # processes if they keep dying
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+                self._broken_pools += 1
+                if self.use_processes and self._broken_pools >= MAX_BROKEN_POOLS:
+                    print(f"[AI DEBUG] [ENCODE] Process pool broke {self._broken_pools} times; encoding on a thread.")
+                    self.use_processes = False
+            if self.counters["failed"] % 20 == 1:
+                print(f"[AI DEBUG] [ENCODE] Encode job failed: {e}")
+        if not job.future.done():
+            job.future.set_result(result)
+        if not self._closed:
+            self._pump()
+
+    def stats(self) -> Dict[str, Any]:
+        stages = {}
+        for stage, values in self._timings.items():
+            ordered = sorted(values)
+            stages[stage] = {
+                "count": len(ordered),
+                "avg": round(sum(ordered) / len(ordered), 2) if ordered else None,
+                "p95": percentile(ordered, 95),
+                "max": ordered[-1] if ordered else None,
+            }
+        return dict(
+            self.counters,
+            pending=len(self._pending),
+            running=self._running,
+            processes=isinstance(self._pool, ProcessPoolExecutor),
+            stages=stages,
+        )
+
+    def close(self):
+        self._closed = True
+        while self._pending:
+            job = self._pending.popleft()
+            self._release_slot(job.slot)
+            if not job.future.done():
+                job.future.set_result(None)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        for shm in list(self._free_slots):
+            self._discard_slot(shm)
+        self._free_slots.clear()
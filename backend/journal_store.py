@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+
+class JournaledStore:
+    """
+    Keyed JSON records persisted as a snapshot plus an append-only op journal.
+
+    - `<name>.json` is the snapshot: a JSON list of records, the same format the
+      managers always wrote, so older files load unchanged.
+    - `<name>.journal` holds one JSON op per line ({"op": "put", "id", "rec"} or
+      {"op": "del", "id"}). A mutation appends a single short line.
+    - After `compact_every` ops the current state (from `snapshot_fn`) is written to
+      a temp file, fsynced and renamed over the snapshot, then the journal is truncated.
+      Ops are idempotent, so a crash between rename and truncate only replays no-ops,
+      and a torn last journal line is ignored on load.
+    """
+
+    def __init__(
+        self,
+        snapshot_path: Path,
+        snapshot_fn: Callable[[], Iterable[dict]],
+        compact_every: int = 200,
+    ):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = self.snapshot_path.with_suffix(".journal")
+        self.snapshot_fn = snapshot_fn
+        self.compact_every = max(1, int(compact_every))
+        self._ops_since_compact = 0
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, dict]:
+        """Snapshot + replayed journal, keyed by record id (insertion order preserved)."""
+        records: Dict[str, dict] = {}
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                for item in json.load(f) or []:
+                    if isinstance(item, dict) and item.get("id"):
+                        records[item["id"]] = item
+
+        replayed = 0
+        if self.journal_path.exists():
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        op = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn write from a crash; everything before it is intact
+                        print(f"[AI DEBUG] [STORE] Ignoring corrupt journal line in {self.journal_path.name}")
+                        continue
+                    rid = op.get("id")
+                    if not rid:
+                        continue
+                    if op.get("op") == "put" and isinstance(op.get("rec"), dict):
+                        records[rid] = op["rec"]
+                    elif op.get("op") == "del":
+                        records.pop(rid, None)
+                    replayed += 1
+        self._ops_since_compact = replayed
+        return records
+
+    def put(self, rid: str, record: dict):
+        self._append({"op": "put", "id": rid, "rec": record})
+
+    def delete(self, rid: str):
+        self._append({"op": "del", "id": rid})
+
+    def _append(self, op: dict):
+        line = json.dumps(op, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self._ops_since_compact += 1
+            due = self._ops_since_compact >= self.compact_every
+        if due:
+            self.compact()
+
+    def compact(self, records: Optional[Iterable[dict]] = None):
+        """Atomically replace the snapshot with the current state and truncate the journal."""
+        data = list(records if records is not None else self.snapshot_fn())
+        with self._lock:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(
+                prefix=self.snapshot_path.stem + ".", suffix=".tmp", dir=str(self.snapshot_path.parent)
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_name, self.snapshot_path)
+            except Exception:
+                try:
+                    os.remove(tmp_name)
+                except OSError:
+                    pass
+                raise
+            with open(self.journal_path, "w", encoding="utf-8"):
+                pass
+            self._ops_since_compact = 0
@@ -0,0 +1,120 @@
+import collections
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Pipeline points of one voice turn, in pipeline order. All are measured relative to
+# speech_end (the last voiced mic chunk) and reported in milliseconds.
+SPANS = (
+    "audio_queued",  # last voiced chunk handed to the outbound scheduler
+    "audio_sent",  # ...and written to the session by send_realtime
+    "first_transcript",  # first input transcription of the turn
+    "first_response",  # first response.data audio from the model
+    "first_playback",  # first block written to the output device
+    "turn_complete",
+)
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+class TurnLatencyTracker:
+    """
+    Per-turn voice latency, from the user's last voiced chunk to Monika's audio.
+
+    A turn opens on the VAD speech onset. Every voiced chunk moves `speech_end` (and
+    the watched outbound payload) forward; the other points keep their first value
+    after the turn opened. turn_complete closes the turn and, if the model answered
+    with audio, appends a record of span offsets to a ring of the last `capacity`
+    turns. Marks may come from the playback thread, so state is guarded by a lock.
+    """
+
+    def __init__(self, capacity: int = 200):
+        self._records: collections.deque = collections.deque(maxlen=max(1, int(capacity)))
+        self._lock = threading.Lock()
+        self._turn: Optional[Dict[str, float]] = None
+        self._watch_id: Optional[int] = None
+        self.turns = 0
+        self.abandoned = 0
+
+    # --- Marks ---
+    def start_turn(self, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            if self._turn is not None and "first_response" not in self._turn:
+                self.abandoned += 1
+            self._turn = {"speech_start": now}
+            self._watch_id = None
+
+    def voiced_chunk(self, payload: Any, now: Optional[float] = None):
+        """Records a voiced chunk that was queued upstream as `payload`."""
+        now = time.time() if now is None else now
+        with self._lock:
+            turn = self._turn
+            if turn is None or "turn_complete" in turn:
+                return
+            turn["speech_end"] = now
+            turn["audio_queued"] = now
+            turn.pop("audio_sent", None)
+            self._watch_id = id(payload)
+
+    def sent(self, payload: Any, now: Optional[float] = None):
+        """Called by the sender for each payload; only the watched voiced chunk counts."""
+        if self._watch_id is None or id(payload) != self._watch_id:
+            return
+        with self._lock:
+            if self._turn is not None and self._watch_id == id(payload):
+                self._turn["audio_sent"] = time.time() if now is None else now
+                self._watch_id = None
+
+    def mark_first(self, span: str, now: Optional[float] = None):
+        turn = self._turn
+        if turn is None or span in turn or "speech_end" not in turn:
+            return
+        with self._lock:
+            turn = self._turn
+            if turn is not None and span not in turn:
+                turn[span] = time.time() if now is None else now
+
+    def complete_turn(self, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Closes the open turn; returns its record if it produced model audio."""
+        with self._lock:
+            turn = self._turn
+            self._turn = None
+            self._watch_id = None
+            if not turn or "speech_end" not in turn or "first_response" not in turn:
+                return None
+            turn["turn_complete"] = time.time() if now is None else now
+            origin = turn["speech_end"]
+            record: Dict[str, Any] = {"ts": origin, "speech_ms": round((origin - turn["speech_start"]) * 1000.0, 1)}
+            for span in SPANS:
+                if span in turn:
+                    record[span] = round((turn[span] - origin) * 1000.0, 1)
+            self._records.append(record)
+            self.turns += 1
+            return record
+
+    # --- Reporting ---
+    def records(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = list(self._records)
+        return items[-limit:] if limit else items
+
+    def summary(self) -> Dict[str, Any]:
+        records = self.records()
+        spans: Dict[str, Dict[str, Any]] = {}
+        for span in SPANS:
+            values = sorted(r[span] for r in records if span in r)
+            spans[span] = {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            }
+        return {"turns": self.turns, "abandoned": self.abandoned, "window": len(records), "spans_ms": spans}
@@ -1,9 +1,11 @@
 import asyncio
 import base64
+import contextlib
 import io
 import os
 import sys
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import cv2
 import numpy as np
@@ -15,22 +17,37 @@ except Exception:
     sd = None
     _SOUNDDEVICE_AVAILABLE = False
 import PIL.Image
-import mss
 import argparse
-import math
-import struct
 import time
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 import uuid
+import bisect
+import heapq
 from pathlib import Path
 from memory_engine import MemoryEngine
 from session_manager import SessionManager
+from journal_store import JournaledStore
+from settings_service import get_settings_service
+from audio_dsp import (
+    SilenceGate,
+    SilenceSuppressionConfig,
+    StreamingResampler,
+    VADConfig,
+    VoiceActivityDetector,
+)
+from audio_io import MicCaptureThread, PlaybackEngine
+from image_encoder import EncodeService, ImagePayload
+from latency import TurnLatencyTracker
+from outbound import OutboundScheduler
+from screen_capture import DirtyTileFrame, MotionGate, ScreenGrabber
+from recurrence import LOCAL_ZONE, describe_recurrence, iter_occurrences, parse_recurrence
+from session_replay import ReplayMicStream, fake_connect, null_speaker_write, recording
 from therapy_engine import TherapyEngine
 
 from dataclasses import dataclass, asdict
-from typing import Optional, Dict, Any, Callable
+from typing import Optional, Dict, Any, Callable, Iterator
 
 from google import genai
 from google.genai import types
@@ -61,62 +78,111 @@ load_dotenv()
 MODEL = os.getenv("GEMINI_LIVE_MODEL", "models/gemini-2.5-flash-native-audio-preview-12-2025")
 DEFAULT_MODE = "camera"
 
+# Opt-in session capture / offline replay (see session_replay.py)
+RECORD_SESSION_PATH = os.getenv("MONIKAI_RECORD_SESSION") or None
+REPLAY_SESSION_PATH = os.getenv("MONIKAI_REPLAY_SESSION") or None
+
 client = genai.Client(http_options={"api_version": "v1beta"}, api_key=os.getenv("GEMINI_API_KEY"))
 
 # --------------------------------------------------------------------------------------
 # Settings + Time Context
 # --------------------------------------------------------------------------------------
 BASE_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
-DATA_DIR = BASE_DIR.parent / "data"
+# MONIKAI_DATA_DIR points a run at another data directory (offline replays, tests)
+DATA_DIR = Path(os.getenv("MONIKAI_DATA_DIR") or BASE_DIR.parent / "data")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 SETTINGS_PATH = DATA_DIR / "settings.json"
+settings_service = get_settings_service(SETTINGS_PATH)
 
 
 def load_settings_safe() -> dict:
-    try:
-        with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+    """Cached settings snapshot (shared, read-only); see SettingsService."""
+    return settings_service.get()
 
 
-def get_time_context() -> dict:
+class TimeContextProvider:
     """
-    Returns local time context based on settings.json time_settings.
+    Local time context based on settings.json time_settings.
     Supports:
       - mode=system (default): uses OS local time zone
       - mode=manual: uses IANA timezone in 'timezone'
+
+    The resolved zone is cached per settings version, and the formatted context dict is
+    memoized for `memo_sec`, so frequent callers pay neither a file read nor a zone lookup.
+    Schedulers should use now(), which is always exact.
     """
-    settings = load_settings_safe()
-    cfg = (settings.get("time_settings") or {})
-    mode = (cfg.get("mode") or "system").lower()
-
-    if mode == "manual":
-        tz_name = cfg.get("timezone") or "UTC"
-        tz = ZoneInfo(tz_name)
-        now = datetime.now(tz)
-        offset = now.strftime("%z")
-        return {
-            "mode": "manual",
+
+    def __init__(self, settings=None, memo_sec: float = 0.25):
+        self.settings = settings or settings_service
+        self.memo_sec = memo_sec
+        self._version: Optional[int] = None
+        self._mode = "system"
+        self._tz_name: Optional[str] = None
+        self._tz = None  # ZoneInfo in manual mode; None means OS local time
+        self._ctx: Optional[dict] = None
+        self._ctx_until = 0.0
+
+    def _resolve(self):
+        self.settings.get()
+        version = self.settings.version
+        if version == self._version:
+            return
+        cfg = self.settings.section("time_settings")
+        mode = (cfg.get("mode") or "system").lower()
+        if mode == "manual":
+            tz_name = cfg.get("timezone") or "UTC"
+            try:
+                tz = ZoneInfo(tz_name)
+            except Exception as e:
+                print(f"[AI DEBUG] [TIME] Invalid timezone {tz_name!r}, using UTC: {e}")
+                tz_name, tz = "UTC", ZoneInfo("UTC")
+            self._mode, self._tz_name, self._tz = "manual", tz_name, tz
+        else:
+            self._mode, self._tz_name, self._tz = "system", None, None
+        self._version = version
+        self._ctx = None
+
+    def zone_key(self) -> str:
+        """IANA name of the configured zone, or LOCAL_ZONE in system mode."""
+        self._resolve()
+        return self._tz_name if self._mode == "manual" and self._tz_name else LOCAL_ZONE
+
+    def now(self) -> datetime:
+        """Current aware local time."""
+        self._resolve()
+        if self._tz is not None:
+            return datetime.now(self._tz)
+        return datetime.now().astimezone()
+
+    def context(self) -> dict:
+        mono = time.monotonic()
+        self._resolve()
+        if self._ctx is not None and mono < self._ctx_until:
+            return dict(self._ctx)
+
+        now = self.now()
+        if self._mode == "manual":
+            tz_name = self._tz_name
+        else:
+            tzinfo = now.tzinfo
+            tz_name = getattr(tzinfo, "key", None) or str(tzinfo) or "local"
+        self._ctx = {
+            "mode": self._mode,
             "timezone": tz_name,
             "iso": now.isoformat(),
-            "offset": offset,
+            "offset": now.strftime("%z"),
             "epoch_ms": int(now.timestamp() * 1000),
         }
+        self._ctx_until = mono + self.memo_sec
+        return dict(self._ctx)
 
-    # system mode
-    now_local = datetime.now().astimezone()
-    tzinfo = now_local.tzinfo
-    tz_name = getattr(tzinfo, "key", None) or str(tzinfo) or "local"
-    offset = now_local.strftime("%z")
-
-    return {
-        "mode": "system",
-        "timezone": tz_name,
-        "iso": now_local.isoformat(),
-        "offset": offset,
-        "epoch_ms": int(now_local.timestamp() * 1000),
-    }
+
+time_context = TimeContextProvider()
+
+
+def get_time_context() -> dict:
+    """Returns local time context based on settings.json time_settings (see TimeContextProvider)."""
+    return time_context.context()
 
 
 HOLIDAYS = {
@@ -149,8 +215,7 @@ def get_holiday_context() -> Optional[str]:
     day = now.day
     
     # Check settings for custom dates (Format "MM-DD": "Name")
-    settings = load_settings_safe()
-    custom = settings.get("special_dates") or {}
+    custom = settings_service.section("special_dates")
     key = f"{month:02d}-{day:02d}"
     if key in custom:
         return custom[key]
@@ -168,166 +233,327 @@ class CalendarEvent:
     start_iso: str
     end_iso: str
     description: Optional[str] = None
+    recurrence: Optional[dict] = None  # normalized rule, see recurrence.parse_recurrence
+    tz: Optional[str] = None  # zone key a series repeats in (wall-clock time across DST)
+
+def _parse_iso(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
 
 class CalendarManager:
-    def __init__(self, storage_dir: Path, on_update: Optional[Callable[[], Any]] = None):
+    def __init__(self, storage_dir: Path, on_update: Optional[Callable[[dict], Any]] = None):
         self.storage_dir = storage_dir
+        # on_update(delta): {"version", "added", "updated", "removed"} or {"version", "reset": True}
         self.on_update = on_update
+        # Seeded from the clock so versions keep increasing across restarts (clients see a gap, not a false match)
+        self.version = int(time.time() * 1000)
         self.events: Dict[str, CalendarEvent] = {}
         self.user_birthday: Optional[tuple[int, int]] = None
+        # Sorted (start epoch, event id) pairs; start times are parsed once on load/create
+        self._start_index: list[tuple[float, str]] = []
+        self._start_ts: Dict[str, float] = {}
+        # Recurring series are kept out of the start index and expanded on demand
+        self._recurring: Dict[str, CalendarEvent] = {}
+        # Per-year virtual events, invalidated when special_dates or the birthday change
+        self._special_dates_cache: Optional[Dict[tuple[int, int], str]] = None
+        self._special_dates_version: Optional[int] = None
+        self._virtual_specs: Dict[int, list] = {}
+        self._virtual_local: Dict[int, list[CalendarEvent]] = {}
+        self._store = JournaledStore(
+            storage_dir / "calendar.json",
+            snapshot_fn=lambda: [e.__dict__ for e in self.events.values()],
+        )
+        # Holiday edits in settings.json change every client's virtual events
+        self._unsubscribe_settings = settings_service.subscribe(self._on_settings_changed)
+
+    def _on_settings_changed(self, settings: dict):
+        before = self._special_dates_cache
+        if before is not None and self._special_dates() != before:
+            self._emit_reset()
+
+    def _index_add(self, event: CalendarEvent):
+        if event.recurrence:
+            self._recurring[event.id] = event
+            return
+        try:
+            ts = _parse_iso(event.start_iso).timestamp()
+        except Exception:
+            print(f"[AI DEBUG] [CALENDAR] Unparseable start for event {event.id}: {event.start_iso!r}")
+            return
+        self._start_ts[event.id] = ts
+        bisect.insort(self._start_index, (ts, event.id))
+
+    def _index_remove(self, event_id: str):
+        self._recurring.pop(event_id, None)
+        ts = self._start_ts.pop(event_id, None)
+        if ts is None:
+            return
+        i = bisect.bisect_left(self._start_index, (ts, event_id))
+        if i < len(self._start_index) and self._start_index[i] == (ts, event_id):
+            del self._start_index[i]
+
+    def _rebuild_index(self):
+        self._start_ts = {}
+        self._recurring = {}
+        for event in self.events.values():
+            if event.recurrence:
+                self._recurring[event.id] = event
+                continue
+            try:
+                self._start_ts[event.id] = _parse_iso(event.start_iso).timestamp()
+            except Exception:
+                print(f"[AI DEBUG] [CALENDAR] Unparseable start for event {event.id}: {event.start_iso!r}")
+        self._start_index = sorted((ts, eid) for eid, ts in self._start_ts.items())
+
+    def _events_between(self, start_ts: float, end_ts: float) -> list[CalendarEvent]:
+        """Stored events with start in [start_ts, end_ts), in start order. O(log n + k)."""
+        lo = bisect.bisect_left(self._start_index, (start_ts,))
+        hi = bisect.bisect_left(self._start_index, (end_ts,), lo)
+        return [self.events[eid] for _, eid in self._start_index[lo:hi]]
+
+    # Expansion window for get_all_events (the UI gets concrete occurrences, not rules)
+    RECURRENCE_PAST_DAYS = 31
+    RECURRENCE_FUTURE_DAYS = 366
+    MAX_OCCURRENCES_PER_SERIES = 500
+
+    def _occurrences_between(self, start: datetime, end: datetime, limit: Optional[int] = None) -> Iterator[CalendarEvent]:
+        """Occurrences of recurring series with start in [start, end); each series is expanded lazily."""
+        for series in list(self._recurring.values()):
+            yield from self._expand_series(series, start, end, limit)
+
+    def _expand_series(self, series: CalendarEvent, start: datetime, end: datetime, limit: Optional[int] = None) -> Iterator[CalendarEvent]:
+        try:
+            first = _parse_iso(series.start_iso)
+            duration = _parse_iso(series.end_iso) - first
+        except Exception:
+            print(f"[AI DEBUG] [CALENDAR] Unparseable recurring event {series.id}")
+            return
+        end_ts = end.timestamp()
+        zone = series.tz or time_context.zone_key()
+        for n, occ in enumerate(iter_occurrences(first, series.recurrence, after=start, zone=zone)):
+            if occ.timestamp() >= end_ts or (limit is not None and n >= limit):
+                break
+            yield CalendarEvent(
+                id=f"{series.id}@{occ.strftime('%Y%m%dT%H%M%S')}",
+                summary=series.summary,
+                start_iso=occ.isoformat(),
+                end_iso=(occ + duration).isoformat(),
+                description=series.description,
+                recurrence=series.recurrence,
+                tz=series.tz,
+            )
+
+    def _client_window(self) -> tuple[datetime, datetime]:
+        now_local = datetime.now().astimezone()
+        return (
+            now_local - timedelta(days=self.RECURRENCE_PAST_DAYS),
+            now_local + timedelta(days=self.RECURRENCE_FUTURE_DAYS),
+        )
+
+    def _client_items(self, event: CalendarEvent) -> list[CalendarEvent]:
+        """What get_all_events shows for one stored event (a series becomes its occurrences)."""
+        if not event.recurrence:
+            return [event]
+        start, end = self._client_window()
+        return list(self._expand_series(event, start, end, self.MAX_OCCURRENCES_PER_SERIES))
+
+    # --- Change notifications (versioned deltas) ---
+    def _emit(self, added=(), updated=(), removed=()):
+        self.version += 1
+        if self.on_update:
+            self.on_update({
+                "version": self.version,
+                "added": [e.__dict__ for e in added],
+                "updated": [e.__dict__ for e in updated],
+                "removed": list(removed),
+            })
+
+    def _emit_reset(self):
+        """Tells listeners to refetch the full snapshot (load, holiday/birthday changes)."""
+        self.version += 1
+        if self.on_update:
+            self.on_update({"version": self.version, "reset": True})
+
+    def snapshot(self) -> dict:
+        return {"version": self.version, "events": [e.__dict__ for e in self.get_all_events()]}
+
+    def _resolve_id(self, event_id: str) -> str:
+        """Maps an occurrence id ("<series id>@<start>") back to its series."""
+        if event_id in self.events or "@" not in event_id:
+            return event_id
+        return event_id.split("@", 1)[0]
 
     def set_user_birthday(self, month: int, day: int):
-        self.user_birthday = (month, day)
+        if self.user_birthday != (month, day):
+            self.user_birthday = (month, day)
+            self._invalidate_virtual_events()
+            self._emit_reset()
+
+    # --- Virtual (holiday / special date / birthday) events, memoized per year ---
+    def _invalidate_virtual_events(self):
+        self._virtual_specs = {}
+        self._virtual_local = {}
+
+    def _special_dates(self) -> Dict[tuple[int, int], str]:
+        """HOLIDAYS merged with settings.json special_dates; rebuilt only when the settings version changes."""
+        custom_dates = settings_service.section("special_dates")
+        version = settings_service.version
+        if self._special_dates_cache is not None and version == self._special_dates_version:
+            return self._special_dates_cache
+
+        all_holidays = HOLIDAYS.copy()
+        for date_str, name in custom_dates.items():
+            try:
+                m, d = map(int, date_str.split('-'))
+                all_holidays[(m, d)] = name
+            except Exception:
+                pass
 
-    def _save(self):
-        data = [e.__dict__ for e in self.events.values()]
+        if all_holidays != self._special_dates_cache:
+            self._invalidate_virtual_events()
+        self._special_dates_cache = all_holidays
+        self._special_dates_version = version
+        return all_holidays
+
+    def _virtual_year(self, year: int) -> list[tuple[datetime, str, str, str]]:
+        """(naive local midnight, id, summary, description) for every virtual event in `year`."""
+        all_holidays = self._special_dates()
+        specs = self._virtual_specs.get(year)
+        if specs is not None:
+            return specs
+
+        specs = []
+        if self.user_birthday:
+            bm, bd = self.user_birthday
+            try:
+                specs.append((datetime(year, bm, bd), f"birthday-{year}", "User's Birthday", "Happy Birthday!"))
+            except ValueError:
+                pass
+        for (month, day), name in all_holidays.items():
+            try:
+                specs.append((datetime(year, month, day), f"holiday-{year}-{month:02d}-{day:02d}", name, "Holiday"))
+            except ValueError:
+                pass
+        specs.sort(key=lambda spec: spec[0])
+        self._virtual_specs[year] = specs
+        return specs
+
+    def _virtual_year_local_events(self, year: int) -> list[CalendarEvent]:
+        specs = self._virtual_year(year)
+        events = self._virtual_local.get(year)
+        if events is None:
+            events = []
+            for day_start, event_id, summary, description in specs:
+                h_start = day_start.astimezone()
+                events.append(CalendarEvent(
+                    id=event_id,
+                    summary=summary,
+                    start_iso=h_start.isoformat(),
+                    end_iso=(h_start + timedelta(days=1)).isoformat(),
+                    description=description,
+                ))
+            self._virtual_local[year] = events
+        return events
+
+    def _save(self, event_id: str):
+        """Journals the current state of one event (a put, or a delete if it is gone)."""
         try:
-            file_path = self.storage_dir / "calendar.json"
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            if self.on_update:
-                self.on_update()
+            event = self.events.get(event_id)
+            if event is not None:
+                self._store.put(event_id, event.__dict__)
+            else:
+                self._store.delete(event_id)
         except Exception as e:
             print(f"[AI DEBUG] [CALENDAR] Failed to save events: {e}")
 
     def load(self):
-        file_path = self.storage_dir / "calendar.json"
-        if not os.path.exists(file_path):
+        if not self._store.snapshot_path.exists() and not self._store.journal_path.exists():
             return
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = self._store.load()
             
             self.events.clear()
-            for item in data:
+            for item in data.values():
                 event = CalendarEvent(**item)
                 self.events[event.id] = event
-            if self.on_update:
-                self.on_update()
+            self._rebuild_index()
+            if self._store.journal_path.exists() and self._store.journal_path.stat().st_size:
+                self._store.compact()
+            self._emit_reset()
         except Exception as e:
             print(f"[AI DEBUG] [CALENDAR] Failed to load events: {e}")
 
-    def create_event(self, summary: str, start_iso: str, end_iso: str, description: Optional[str] = None) -> CalendarEvent:
+    def create_event(self, summary: str, start_iso: str, end_iso: str, description: Optional[str] = None, recurrence=None) -> CalendarEvent:
+        rule = parse_recurrence(recurrence)
         event_id = str(uuid.uuid4())
-        event = CalendarEvent(id=event_id, summary=summary, start_iso=start_iso, end_iso=end_iso, description=description)
+        event = CalendarEvent(
+            id=event_id,
+            summary=summary,
+            start_iso=start_iso,
+            end_iso=end_iso,
+            description=description,
+            recurrence=rule,
+            tz=time_context.zone_key() if rule else None,
+        )
         self.events[event_id] = event
-        self._save()
+        self._index_add(event)
+        self._save(event_id)
+        self._emit(added=self._client_items(event))
         return event
 
     def update_event(self, event_id: str, summary: str = None) -> bool:
+        event_id = self._resolve_id(event_id)
         if event_id in self.events:
             evt = self.events[event_id]
             if summary is not None:
                 evt.summary = summary
-            self._save()
+            self._save(event_id)
+            self._emit(updated=self._client_items(evt))
             return True
         return False
 
     def list_events(self, start_range_iso: str, end_range_iso: str) -> list[CalendarEvent]:
-        start_range = datetime.fromisoformat(start_range_iso.replace('Z', '+00:00'))
-        end_range = datetime.fromisoformat(end_range_iso.replace('Z', '+00:00'))
-        results = [e for e in self.events.values() if start_range <= datetime.fromisoformat(e.start_iso.replace('Z', '+00:00')) < end_range]
+        start_range = _parse_iso(start_range_iso)
+        end_range = _parse_iso(end_range_iso)
+        results = self._events_between(start_range.timestamp(), end_range.timestamp())
+        results.extend(self._occurrences_between(start_range, end_range))
         
-        # Inject Holidays & Custom Dates
-        start_year = start_range.year
-        end_year = end_range.year
+        # Inject Holidays, Custom Dates & Birthday (from the memoized per-year table)
         tz = start_range.tzinfo
-        
-        settings = load_settings_safe()
-        custom_dates = settings.get("special_dates") or {}
-        all_holidays = HOLIDAYS.copy()
-        for date_str, name in custom_dates.items():
-            try:
-                m, d = map(int, date_str.split('-'))
-                all_holidays[(m, d)] = name
-            except: pass
-
-        for year in range(start_year, end_year + 1):
-            # Inject Birthday
-            if self.user_birthday:
-                bm, bd = self.user_birthday
-                try:
-                    b_start = datetime(year, bm, bd, 0, 0, 0, tzinfo=tz)
-                    if start_range <= b_start < end_range:
-                        results.append(CalendarEvent(
-                            id=f"birthday-{year}", summary="User's Birthday",
-                            start_iso=b_start.isoformat(), end_iso=(b_start + timedelta(days=1)).isoformat(), description="Happy Birthday!"
-                        ))
-                except ValueError: pass
-
-            for (month, day), name in all_holidays.items():
-                try:
-                    h_start = datetime(year, month, day, 0, 0, 0, tzinfo=tz)
-                    if start_range <= h_start < end_range:
-                        results.append(CalendarEvent(
-                            id=f"holiday-{year}-{month:02d}-{day:02d}",
-                            summary=name,
-                            start_iso=h_start.isoformat(),
-                            end_iso=(h_start + timedelta(days=1)).isoformat(),
-                            description="Holiday"
-                        ))
-                except ValueError: pass
+        for year in range(start_range.year, end_range.year + 1):
+            for day_start, event_id, summary, description in self._virtual_year(year):
+                h_start = day_start.replace(tzinfo=tz)
+                if start_range <= h_start < end_range:
+                    results.append(CalendarEvent(
+                        id=event_id,
+                        summary=summary,
+                        start_iso=h_start.isoformat(),
+                        end_iso=(h_start + timedelta(days=1)).isoformat(),
+                        description=description,
+                    ))
 
         results.sort(key=lambda e: e.start_iso)
         return results
 
     def get_all_events(self) -> list[CalendarEvent]:
         """Returns all stored events plus holidays for the current and adjacent years."""
-        results = list(self.events.values())
-        
+        results = [e for e in self.events.values() if not e.recurrence]
+        results.extend(self._occurrences_between(*self._client_window(), limit=self.MAX_OCCURRENCES_PER_SERIES))
+
         # Inject Holidays & Custom Dates (Current Year +/- 2)
         now = datetime.now()
-        years = range(now.year - 2, now.year + 3)
-        
-        settings = load_settings_safe()
-        custom_dates = settings.get("special_dates") or {}
-        all_holidays = HOLIDAYS.copy()
-        for date_str, name in custom_dates.items():
-            try:
-                m, d = map(int, date_str.split('-'))
-                all_holidays[(m, d)] = name
-            except: pass
-
-        for year in years:
-            # Inject Birthday
-            if self.user_birthday:
-                bm, bd = self.user_birthday
-                try:
-                    h_start = datetime(year, bm, bd, 0, 0, 0).astimezone()
-                    results.append(CalendarEvent(
-                        id=f"birthday-{year}", summary="User's Birthday",
-                        start_iso=h_start.isoformat(), end_iso=(h_start + timedelta(days=1)).isoformat(), description="Happy Birthday!"
-                    ))
-                except ValueError: pass
-
-            for (month, day), name in all_holidays.items():
-                try:
-                    h_start = datetime(year, month, day, 0, 0, 0).astimezone()
-                    results.append(CalendarEvent(
-                        id=f"holiday-{year}-{month:02d}-{day:02d}",
-                        summary=name,
-                        start_iso=h_start.isoformat(),
-                        end_iso=(h_start + timedelta(days=1)).isoformat(),
-                        description="Holiday"
-                    ))
-                except ValueError: pass
+        for year in range(now.year - 2, now.year + 3):
+            results.extend(self._virtual_year_local_events(year))
 
         results.sort(key=lambda e: e.start_iso)
         return results
 
     def get_todays_events(self) -> list[CalendarEvent]:
         now = datetime.now()
-        now_date = now.date()
-        todays = []
-        for e in self.events.values():
-            try:
-                dt = datetime.fromisoformat(e.start_iso.replace('Z', '+00:00'))
-                # Convert to local system time
-                local_dt = dt.astimezone(None)
-                if local_dt.date() == now_date:
-                    todays.append(e)
-            except Exception:
-                pass
+        # Local system day boundaries
+        day_start = datetime(now.year, now.month, now.day)
+        todays = self._events_between(day_start.timestamp(), (day_start + timedelta(days=1)).timestamp())
+        todays.extend(self._occurrences_between(day_start.astimezone(), (day_start + timedelta(days=1)).astimezone()))
         
         # Check for birthday today
         if self.user_birthday:
@@ -354,9 +580,14 @@ class CalendarManager:
         return todays
 
     def delete_event(self, event_id: str) -> bool:
+        """Deletes an event; an occurrence id deletes its whole series."""
+        event_id = self._resolve_id(event_id)
         if event_id in self.events:
+            removed = [e.id for e in self._client_items(self.events[event_id])]
             del self.events[event_id]
-            self._save()
+            self._index_remove(event_id)
+            self._save(event_id)
+            self._emit(removed=removed)
             return True
         return False
 
@@ -370,40 +601,60 @@ class Reminder:
     when_iso: str
     speak: bool
     alert: bool = True  # whether UI should ring/show notification
+    recurrence: Optional[dict] = None  # normalized rule, see recurrence.parse_recurrence
+    series_start_iso: Optional[str] = None  # anchor of the series; when_iso is the next occurrence
+    series_tz: Optional[str] = None  # zone key the series repeats in (wall-clock time across DST)
 
 
 class ReminderManager:
     def __init__(self, get_time_context_fn: Callable[[], dict], storage_dir: Path, on_reminder: Optional[Callable[[Reminder], Any]] = None):
         self.get_time_context_fn = get_time_context_fn
+        # The default provider offers an exact now() without building/parsing the context dict
+        self._now_fn: Optional[Callable[[], datetime]] = time_context.now if get_time_context_fn is get_time_context else None
         self.storage_dir = storage_dir
         self.on_reminder = on_reminder
         self.reminders: Dict[str, Reminder] = {}
-        self.tasks: Dict[str, asyncio.Task] = {}
+        # Single scheduler: min-heap of [due epoch, seq, id]; cancelled entries are tombstoned (id=None)
+        self._heap: list[list] = []
+        self._heap_entries: Dict[str, list] = {}
+        self._seq = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._scheduler_task: Optional[asyncio.Task] = None
+        self._fire_tasks: set = set()  # strong refs, so in-flight callbacks are not collected
+        self._store = JournaledStore(
+            storage_dir / "reminders.json",
+            snapshot_fn=lambda: [self._record(r) for r in self.reminders.values()],
+        )
 
-    def _save(self):
-        data = []
-        for r in self.reminders.values():
-            data.append({
-                "id": r.id,
-                "message": r.message,
-                "when_iso": r.when_iso,
-                "speak": r.speak,
-                "alert": getattr(r, "alert", True),
-            })
+    @staticmethod
+    def _record(r: Reminder) -> dict:
+        return {
+            "id": r.id,
+            "message": r.message,
+            "when_iso": r.when_iso,
+            "speak": r.speak,
+            "alert": getattr(r, "alert", True),
+            "recurrence": r.recurrence,
+            "series_start_iso": r.series_start_iso,
+            "series_tz": r.series_tz,
+        }
+
+    def _save(self, rid: str):
+        """Journals the current state of one reminder (a put, or a delete if it is gone)."""
         try:
-            file_path = self.storage_dir / "reminders.json"
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            reminder = self.reminders.get(rid)
+            if reminder is not None:
+                self._store.put(rid, self._record(reminder))
+            else:
+                self._store.delete(rid)
         except Exception as e:
             print(f"[AI DEBUG] [REMINDERS] Failed to save reminders: {e}")
 
     def load(self):
-        file_path = self.storage_dir / "reminders.json"
-        if not os.path.exists(file_path):
+        if not self._store.snapshot_path.exists() and not self._store.journal_path.exists():
             return
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = self._store.load().values()
             
             for item in data:
                 rid = item["id"]
@@ -418,21 +669,30 @@ class ReminderManager:
                         when_iso=when_iso,
                         speak=item.get("speak", True),
                         alert=item.get("alert", True),
+                        recurrence=item.get("recurrence"),
+                        series_start_iso=item.get("series_start_iso"),
+                        series_tz=item.get("series_tz"),
                     )
                     self.reminders[rid] = reminder
-                    self.tasks[rid] = asyncio.create_task(self._runner(reminder, when))
+                    self._schedule(rid, when.timestamp())
                 except Exception as e:
                     print(f"[AI DEBUG] [REMINDERS] Skipping invalid reminder item: {e}")
+            if self._store.journal_path.exists() and self._store.journal_path.stat().st_size:
+                self._store.compact()
         except Exception as e:
             print(f"[AI DEBUG] [REMINDERS] Failed to load reminders: {e}")
 
     def clear(self):
-        for task in self.tasks.values():
-            task.cancel()
-        self.tasks.clear()
+        if self._scheduler_task and not self._scheduler_task.done():
+            self._scheduler_task.cancel()
+        self._scheduler_task = None
+        self._heap.clear()
+        self._heap_entries.clear()
         self.reminders.clear()
 
     def _now(self) -> datetime:
+        if self._now_fn is not None:
+            return self._now_fn()
         ctx = self.get_time_context_fn()
         return datetime.fromisoformat(ctx["iso"])
 
@@ -443,24 +703,103 @@ class ReminderManager:
         dt_naive = datetime.strptime(at_str, "%Y-%m-%d %H:%M")
         return dt_naive.replace(tzinfo=tz)
 
-    async def _runner(self, reminder: Reminder, when: datetime):
-        delay = (when - self._now()).total_seconds()
-        if delay > 0:
-            await asyncio.sleep(delay)
+    # --- Scheduler ---
+    # Deadlines are absolute epoch seconds, so DST transitions cannot shift them. Sleeps are
+    # capped so a wall-clock jump (suspend/resume, NTP step) is noticed within that cap.
+    MAX_SLEEP_SEC = 30.0
+
+    def _schedule(self, rid: str, due_ts: float):
+        """Add or reschedule a reminder. O(log n)."""
+        self._unschedule(rid)
+        self._seq += 1
+        entry = [due_ts, self._seq, rid]
+        self._heap_entries[rid] = entry
+        heapq.heappush(self._heap, entry)
+        self._ensure_scheduler()
+        if self._wakeup and self._heap[0] is entry:
+            # New earliest deadline; re-arm the sleeping scheduler
+            self._wakeup.set()
+
+    def _unschedule(self, rid: str):
+        entry = self._heap_entries.pop(rid, None)
+        if entry is not None:
+            entry[2] = None
+        # Drop tombstones from the top so the heap head is always live
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+
+    def _ensure_scheduler(self):
+        if self._scheduler_task and not self._scheduler_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop yet; the scheduler starts with the next create/load inside the loop
+            return
+        self._wakeup = asyncio.Event()
+        self._scheduler_task = loop.create_task(self._scheduler())
 
-        if self.on_reminder:
-            maybe = self.on_reminder(reminder)
-            if asyncio.iscoroutine(maybe):
-                await maybe
+    async def _scheduler(self):
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
 
-        self.reminders.pop(reminder.id, None)
-        self._save()
-        task = self.tasks.pop(reminder.id, None)
-        if task:
-            try:
-                task.cancel()
-            except Exception:
-                pass
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay, self.MAX_SLEEP_SEC))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due_ts, _, rid = heapq.heappop(self._heap)
+            if rid is None:
+                continue
+            self._heap_entries.pop(rid, None)
+            reminder = self.reminders.get(rid)
+            if reminder is not None:
+                task = asyncio.create_task(self._fire(reminder))
+                self._fire_tasks.add(task)
+                task.add_done_callback(self._fire_tasks.discard)
+
+    async def _fire(self, reminder: Reminder):
+        # Recurring reminders are advanced before the callback so a slow callback cannot refire them
+        next_when = self._next_occurrence(reminder) if reminder.recurrence else None
+        if next_when is not None:
+            fired = Reminder(**asdict(reminder))
+            reminder.when_iso = next_when.isoformat(timespec="seconds")
+            self._schedule(reminder.id, next_when.timestamp())
+        else:
+            fired = reminder
+            self.reminders.pop(reminder.id, None)
+        self._save(reminder.id)
+        try:
+            if self.on_reminder:
+                maybe = self.on_reminder(fired)
+                if asyncio.iscoroutine(maybe):
+                    await maybe
+        except Exception as e:
+            print(f"[AI DEBUG] [REMINDERS] Reminder callback failed: {e}")
+
+    def _zone_key(self) -> str:
+        if self._now_fn is not None:
+            return time_context.zone_key()
+        ctx = self.get_time_context_fn() or {}
+        return ctx.get("timezone") if ctx.get("mode") == "manual" and ctx.get("timezone") else LOCAL_ZONE
+
+    def _next_occurrence(self, reminder: Reminder) -> Optional[datetime]:
+        """First occurrence strictly after both the one that just fired and now (missed ones are skipped)."""
+        try:
+            anchor = datetime.fromisoformat(reminder.series_start_iso or reminder.when_iso)
+            after = max(datetime.fromisoformat(reminder.when_iso).timestamp(), time.time()) + 0.001
+            after_dt = datetime.fromtimestamp(after, tz=anchor.tzinfo) if anchor.tzinfo else datetime.fromtimestamp(after)
+            zone = reminder.series_tz or self._zone_key()
+            return next(iter_occurrences(anchor, reminder.recurrence, after=after_dt, zone=zone), None)
+        except Exception as e:
+            print(f"[AI DEBUG] [REMINDERS] Failed to advance recurring reminder {reminder.id}: {e}")
+            return None
 
     def create(
         self,
@@ -471,10 +810,12 @@ class ReminderManager:
         speak: bool = True,
         alert: bool = True,
         dedup_window_sec: int = 60,
+        recurrence=None,
     ) -> Reminder:
         message = (message or "").strip()
         if not message:
             raise ValueError("Message is required.")
+        rule = parse_recurrence(recurrence)
         provided = 0
         if at and str(at).strip():
             provided += 1
@@ -503,7 +844,7 @@ class ReminderManager:
         for r in self.reminders.values():
             try:
                 existing = datetime.fromisoformat(r.when_iso)
-                if r.message.strip().lower() == msg_norm:
+                if r.message.strip().lower() == msg_norm and r.recurrence == rule:
                     if abs((existing - when).total_seconds()) <= dedup_window_sec:
                         return r
             except Exception:
@@ -516,10 +857,13 @@ class ReminderManager:
             when_iso=when_iso,
             speak=bool(speak),
             alert=bool(alert),
+            recurrence=rule,
+            series_start_iso=when_iso if rule else None,
+            series_tz=self._zone_key() if rule else None,
         )
         self.reminders[rid] = reminder
-        self.tasks[rid] = asyncio.create_task(self._runner(reminder, when))
-        self._save()
+        self._schedule(rid, when.timestamp())
+        self._save(rid)
         return reminder
 
     def update(self, rid: str, message: str = None) -> bool:
@@ -527,7 +871,7 @@ class ReminderManager:
             rem = self.reminders[rid]
             if message is not None:
                 rem.message = message
-            self._save()
+            self._save(rid)
             return True
         return False
 
@@ -535,14 +879,11 @@ class ReminderManager:
         return list(self.reminders.values())
 
     def cancel(self, rid: str) -> bool:
-        task = self.tasks.get(rid)
-        if task:
-            task.cancel()
+        self._unschedule(rid)
         existed = rid in self.reminders
         self.reminders.pop(rid, None)
-        self.tasks.pop(rid, None)
         if existed:
-            self._save()
+            self._save(rid)
         return existed
 
 
@@ -561,6 +902,7 @@ create_event_tool = {
             "start_iso": {"type": "STRING", "description": "The start time of the event in ISO 8601 format (e.g., '2024-05-21T10:00:00Z')."},
             "end_iso": {"type": "STRING", "description": "The end time of the event in ISO 8601 format (e.g., '2024-05-21T11:00:00Z')."},
             "description": {"type": "STRING", "description": "An optional longer description for the event."},
+            "recurrence": {"type": "STRING", "description": "Optional repeat rule: 'daily', 'weekly', or RRULE-style like 'FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;COUNT=10'. Stored once as a single series."},
         },
         "required": ["summary", "start_iso", "end_iso"],
     },
@@ -581,7 +923,7 @@ list_events_tool = {
 
 delete_event_tool = {
     "name": "delete_event",
-    "description": "Deletes an event from the calendar by its ID.",
+    "description": "Deletes an event from the calendar by its ID. Deleting an occurrence of a recurring event deletes the whole series.",
     "parameters": {"type": "OBJECT", "properties": {"event_id": {"type": "STRING", "description": "The unique ID of the event to delete."}}, "required": ["event_id"]},
 }
 
@@ -603,6 +945,7 @@ create_reminder_tool = {
             "in_seconds": {"type": "INTEGER", "description": "Remind in N seconds (useful for timers)."},
             "speak": {"type": "BOOLEAN", "description": "If true, the assistant will speak the reminder aloud.", "default": True},
             "alert": {"type": "BOOLEAN", "description": "If true, the UI can ring/show a notification when the reminder fires.", "default": True},
+            "recurrence": {"type": "STRING", "description": "Optional repeat rule starting at the first time: 'hourly', 'daily', 'weekly', or RRULE-style like 'FREQ=HOURLY;INTERVAL=2' or 'FREQ=WEEKLY;BYDAY=MO,FR'. Use this instead of creating many reminders."},
         },
         "required": ["message"],
     },
@@ -716,6 +1059,21 @@ memory_search_tool = {
     },
 }
 
+search_history_tool = {
+    "name": "search_history",
+    "description": "Full-text search across all past conversation transcripts (every session). Use it to recall what was said earlier, e.g. 'what did we talk about last Tuesday about X', instead of asking for raw history.",
+    "parameters": {
+        "type": "OBJECT",
+        "properties": {
+            "query": {"type": "STRING", "description": "Words to search for."},
+            "since": {"type": "STRING", "description": "Optional lower bound (ISO date or datetime, local time), e.g. '2024-05-21'."},
+            "until": {"type": "STRING", "description": "Optional upper bound, exclusive (ISO date or datetime, local time)."},
+            "limit": {"type": "INTEGER", "description": "Max results (default 10)."},
+        },
+        "required": ["query"],
+    },
+}
+
 memory_get_page_tool = {
     "name": "memory_get_page",
     "description": "Reads a memory markdown page (global).",
@@ -917,6 +1275,7 @@ tools = [
             clear_work_memory_tool,
             memory_add_entry_tool,
             memory_search_tool,
+            search_history_tool,
             memory_get_page_tool,
             memory_create_page_tool,
             memory_append_page_tool,
@@ -1033,7 +1392,7 @@ class AudioLoop:
         on_device_update=None,
         on_error=None,
         on_reminder_fired=None,
-        on_calendar_update=None, # For local calendar
+        on_calendar_update=None, # For local calendar: receives CalendarManager deltas
         on_personality_update=None,
         on_internal_thought=None,
         input_device_index=None,
@@ -1048,6 +1407,8 @@ class AudioLoop:
         on_study_fields=None,
         on_study_notes=None,
         on_study_page=None,
+        record_session_path=None,
+        replay_session_path=None,
         **_ignored,
     ):
 
@@ -1075,7 +1436,7 @@ class AudioLoop:
         self.output_device_index = output_device_index
 
         self.audio_in_queue = None
-        self.out_queue = None
+        self.out_queue: Optional[OutboundScheduler] = None
         self.paused = False
 
         self.chat_buffer = {"sender": None, "text": ""}
@@ -1101,8 +1462,11 @@ class AudioLoop:
         self.session_mode_kind = "auto"
         self.therapy_engine = TherapyEngine()
 
-        # SessionManager (global, no projects)
-        self.session_manager = SessionManager(DATA_DIR)
+        # SessionManager (global, no projects); old day directories are packed into monthly archives
+        archive_after_days = None
+        if settings_service.get_bool("session_archive.enabled", True):
+            archive_after_days = settings_service.get_int("session_archive.after_days", 30, 1, 3650)
+        self.session_manager = SessionManager(DATA_DIR, archive_after_days=archive_after_days)
 
         # Workspace for files written by tools
         self.workspace_dir = DATA_DIR / "workspace"
@@ -1118,11 +1482,10 @@ class AudioLoop:
         if calendar_manager:
             self.calendar_manager = calendar_manager
         else:
-            def _on_calendar_update():
+            def _on_calendar_update(delta):
                 if self.on_calendar_update:
                     try:
-                        events = [e.__dict__ for e in self.calendar_manager.events.values()]
-                        self.on_calendar_update(events)
+                        self.on_calendar_update(delta)
                     except Exception as e:
                         print(f"[AI DEBUG] [CALENDAR] Failed to emit update: {e}")
             self.calendar_manager = CalendarManager(storage_dir=self.user_memory_dir, on_update=_on_calendar_update)
@@ -1155,6 +1518,7 @@ class AudioLoop:
                 "notes_append": False,
                 "memory_add_entry": False,
                 "memory_search": False,
+                "search_history": False,
                 "memory_get_page": False,
                 "memory_create_page": False,
                 "memory_append_page": False,
@@ -1179,7 +1543,8 @@ class AudioLoop:
         self._pending_confirmations = {}
 
         # Video buffering state
-        self._latest_image_payload = None
+        self._image_payload: Optional[dict] = None
+        self._image_from_screen = False
         self._latest_image_ts = 0.0
         self._last_ui_frame_ts = 0.0
         self._video_stream_enabled = True
@@ -1188,7 +1553,12 @@ class AudioLoop:
         self._reminders_loaded = False
         self._calendar_loaded = False
         self._is_speaking = False
-        self._silence_start_time = None
+        self.vad: Optional[VoiceActivityDetector] = None
+        self.silence_gate: Optional[SilenceGate] = None
+        self.latency = TurnLatencyTracker()
+        self.record_session_path = record_session_path or RECORD_SESSION_PATH
+        self.replay_session_path = replay_session_path or REPLAY_SESSION_PATH
+        self.playback: Optional[PlaybackEngine] = None
 
         # ---------------------------
         # Proactivity / Idle nudges
@@ -1250,9 +1620,25 @@ class AudioLoop:
         self._video_queue_max = 6  # legacy: kept for compatibility
         self._camera_backend_id = None
         self._load_capture_settings()
+        # Pick up capture changes as soon as settings.json changes (server saves, manual edits)
+        self._unsubscribe_settings = settings_service.subscribe(self._load_capture_settings)
         self.video_queue = None
         self._screen_fail_count = 0
         self._last_screen_error_ts = 0.0
+        # One capture thread, so its mss handle and buffers are reused frame after frame
+        self.screen_grabber = ScreenGrabber()
+        self.screen_motion = MotionGate()
+        self.screen_frame = DirtyTileFrame()
+        self._screen_payload_src = None
+        self._screen_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screen-capture")
+        # Camera frames and full screen images are encoded in worker processes
+        self.image_encoder = EncodeService(
+            workers=settings_service.get_int("image_encoding.workers", 1, 1, 4),
+            max_pending=settings_service.get_int("image_encoding.max_pending", 2, 1, 16),
+            use_processes=settings_service.get_bool("image_encoding.process_pool", True),
+        )
+        self._screen_encode = None  # (generation, future) of the composite being encoded
+        self._frame_tasks: set = set()  # speech-start frame sends waiting on an encode
 
     async def handle_reminder_fired(self, rem: Reminder):
         # UI text event (chat log)
@@ -1319,7 +1705,10 @@ class AudioLoop:
         if not self.session or not msg:
             return
         if allow_interrupt or not self._ai_turn_open:
-            await self.session.send(input=msg, end_of_turn=end_of_turn)
+            if self.out_queue:
+                self.out_queue.put_text(msg, end_of_turn)
+            else:
+                await self.session.send(input=msg, end_of_turn=end_of_turn)
             return
         self._pending_system_messages.append((msg, end_of_turn))
 
@@ -1328,6 +1717,9 @@ class AudioLoop:
             return
         while self._pending_system_messages:
             msg, end_of_turn = self._pending_system_messages.popleft()
+            if self.out_queue:
+                self.out_queue.put_text(msg, end_of_turn)
+                continue
             try:
                 await self.session.send(input=msg, end_of_turn=end_of_turn)
             except Exception:
@@ -1490,16 +1882,13 @@ class AudioLoop:
     async def _enqueue_frame(self, payload: dict):
         if not payload:
             return
-        mime_type = payload.get("mime_type", "image/jpeg")
         data = payload.get("data")
-        if isinstance(data, str):
-            b64 = data
-        elif data:
-            b64 = base64.b64encode(data).decode("utf-8")
-        else:
+        if not data:
             return
 
-        self._latest_image_payload = {"mime_type": mime_type, "data": b64}
+        # Raw bytes; base64 only if the UI gets this frame
+        image = ImagePayload(payload.get("mime_type", "image/jpeg"), data)
+        self._latest_image_payload = image
         self._latest_image_ts = time.time()
 
         if self.on_video_frame:
@@ -1510,8 +1899,8 @@ class AudioLoop:
                 self._last_ui_frame_ts = now
                 self.on_video_frame(
                     {
-                        "data": b64,
-                        "mime_type": mime_type,
+                        "data": image.b64,
+                        "mime_type": image["mime_type"],
                         "source": self.video_mode,
                     }
                 )
@@ -1548,6 +1937,10 @@ class AudioLoop:
 
     def stop(self):
         self.stop_event.set()
+        self._unsubscribe_settings()
+        self.image_encoder.close()
+        # A grab already running finishes on its own; don't block the caller on it
+        self._screen_executor.shutdown(wait=False)
 
     def resolve_tool_confirmation(self, request_id, confirmed):
         print(f"[AI DEBUG] [RESOLVE] resolve_tool_confirmation called. ID: {request_id}, Confirmed: {confirmed}")
@@ -1558,12 +1951,15 @@ class AudioLoop:
 
     def clear_audio_queue(self):
         try:
-            if not self.audio_in_queue:
-                return
             count = 0
-            while not self.audio_in_queue.empty():
-                self.audio_in_queue.get_nowait()
-                count += 1
+            if self.audio_in_queue:
+                while not self.audio_in_queue.empty():
+                    self.audio_in_queue.get_nowait()
+                    count += 1
+            if self.playback is not None:
+                dropped_ms = self.playback.flush() / self.playback.bytes_per_ms
+                if dropped_ms > 0:
+                    print(f"[AI DEBUG] [AUDIO] Flushed {dropped_ms:.0f}ms of buffered playback due to interruption.")
             if count > 0:
                 print(f"[AI DEBUG] [AUDIO] Cleared {count} chunks from playback queue due to interruption.")
         except Exception as e:
@@ -1681,11 +2077,24 @@ class AudioLoop:
                     lines.append(f"{sender}: {text}")
             context_text = "\n".join(lines)[-4000:]
 
+            stats_text = ""
+            try:
+                week = self.session_manager.get_week_stats()
+                if week["turns"]:
+                    stats_text = (
+                        f"Statystyki tygodnia: {week['user_turns']} wypowiedzi użytkownika, "
+                        f"{week['ai_turns']} Moniki, {week['words']} słów, "
+                        f"około {week['active_minutes']:.0f} minut aktywnej rozmowy.\n\n"
+                    )
+            except Exception:
+                pass
+
             prompt = (
                 "Wygeneruj tygodniowe podsumowanie relacji Moniki i użytkownika na podstawie historii rozmów. "
                 "Zwróć JSON z polami: recap (2-4 zdania), microgoals (lista 1-2 krótkich celów), "
                 "journal_prompt (1 pytanie do dziennika refleksji). "
                 "Język: polski. Bez markdown.\n\n"
+                f"{stats_text}"
                 f"Historia rozmów (ostatnie 7 dni):\n{context_text}"
             )
 
@@ -1824,71 +2233,65 @@ class AudioLoop:
         if self.video_mode == "camera" and self.camera_source == "backend":
             # Ignore frontend frames when backend camera vision is active
             return
-        if isinstance(frame_data, (bytes, bytearray, memoryview)):
-            b64 = base64.b64encode(bytes(frame_data)).decode("utf-8")
-        else:
+        if not isinstance(frame_data, (bytes, bytearray, memoryview, str)):
             try:
-                if isinstance(frame_data, str):
-                    b64 = frame_data
-                else:
-                    b64 = base64.b64encode(bytes(frame_data)).decode("utf-8")
+                frame_data = bytes(frame_data)
             except Exception:
                 return
-        self._latest_image_payload = {"mime_type": "image/jpeg", "data": b64}
+        self._latest_image_payload = ImagePayload("image/jpeg", frame_data)
         self._latest_image_ts = time.time()
 
     async def send_realtime(self):
         while True:
-            msg = await self.out_queue.get()
+            lane, msg, end_of_turn = await self.out_queue.get()
             try:
-                await self.session.send(input=msg, end_of_turn=False)
+                await self.session.send(input=msg, end_of_turn=end_of_turn)
             except Exception as e:
-                print(f"[AI DEBUG] [SEND] Failed to send realtime chunk: {e}")
+                print(f"[AI DEBUG] [SEND] Failed to send realtime {lane}: {e}")
+                continue
+            if lane == "audio":
+                self.latency.sent(msg)
 
     async def send_frame_now(self, payload: Optional[dict] = None) -> bool:
         if not self.out_queue:
             return False
+        if payload is None:
+            await self._encode_screen_frame()
         payload = payload or self._latest_image_payload
         if not payload or not isinstance(payload, dict):
             return False
-        try:
-            if self.out_queue.full():
-                return False
-            self.out_queue.put_nowait(payload)
-            return True
-        except Exception:
-            return False
+        # Latest-only lane: a frame still waiting to be sent is replaced, never queued behind
+        self.out_queue.put_image(payload)
+        return True
+
+    def get_outbound_stats(self) -> dict:
+        return self.out_queue.stats() if self.out_queue else {}
+
+    def get_latency_metrics(self, recent: int = 20) -> dict:
+        return dict(self.latency.summary(), recent=self.latency.records(recent))
+
+    def get_encoder_stats(self) -> dict:
+        return self.image_encoder.stats()
 
     async def refresh_latest_frame(self, min_age_sec: float = 0.0) -> bool:
         if self.video_mode != "screen":
             return False
-        if min_age_sec and (time.time() - self._latest_image_ts) < min_age_sec:
-            return False
-        frame, _ = await asyncio.to_thread(self._grab_screen)
-        if frame is None:
-            return False
-        await self._enqueue_frame(frame)
-        return True
-
-    def _resample_audio(self, audio_data, input_rate, target_rate):
-        if input_rate == target_rate:
-            return audio_data
-        
-        # Convert bytes to int16 numpy array
-        audio_np = np.frombuffer(audio_data, dtype=np.int16)
-        
-        # Calculate number of samples required
-        duration = len(audio_np) / input_rate
-        target_samples = int(duration * target_rate)
-        
-        # Linear interpolation
-        x_old = np.linspace(0, duration, len(audio_np))
-        x_new = np.linspace(0, duration, target_samples)
-        
-        resampled = np.interp(x_new, x_old, audio_np).astype(np.int16)
-        return resampled.tobytes()
+        refreshed = False
+        if not min_age_sec or (time.time() - self._latest_image_ts) >= min_age_sec:
+            changed, ui_update = await self._capture_screen()
+            refreshed = await self._apply_screen_capture(changed, ui_update)
+        # Callers read _latest_image_payload next; encode it in the pool first
+        await self._encode_screen_frame()
+        return refreshed
 
     async def listen_audio(self):
+        if self.replay_session_path:
+            # Offline replay: recorded mic audio (already 16 kHz) instead of a device
+            print(f"[AI DEBUG] [REPLAY] Mic input from {self.replay_session_path}")
+            self.audio_stream = ReplayMicStream(self.replay_session_path)
+            await self._run_mic(self.audio_stream.rate, {})
+            return
+
         mic_info = pya.get_default_input_device_info()
         resolved_input_device_index = None
 
@@ -1948,52 +2351,78 @@ class AudioLoop:
             return
 
         kwargs = {"exception_on_overflow": False} if __debug__ else {}
+        await self._run_mic(native_rate, kwargs)
+
+    async def _run_mic(self, native_rate: int, read_kwargs: dict):
+        # Stateful: filter history and phase carry across chunks (no boundary clicks, anti-aliased)
+        resampler = StreamingResampler(native_rate, SEND_SAMPLE_RATE)
+        vad = VoiceActivityDetector(VADConfig.from_settings(load_settings_safe()))
+        self.vad = vad
+        print(f"[AI DEBUG] [VAD] Detector: {vad.detector.name} (threshold {vad.cfg.threshold:.0f}, adaptive={vad.cfg.adaptive})")
+
+        # Silent stretches are not streamed upstream once the VAD hangover has passed
+        gate = SilenceGate(
+            SilenceSuppressionConfig.from_settings(load_settings_safe()),
+            bytes_per_ms=SEND_SAMPLE_RATE * 2 / 1000.0,
+        )
+        self.silence_gate = gate
 
-        VAD_THRESHOLD = 800
-        SILENCE_DURATION = 1.2
+        # Read enough frames to result in CHUNK_SIZE after resampling
+        read_size = int(CHUNK_SIZE * native_rate / SEND_SAMPLE_RATE)
+        capture = MicCaptureThread(self.audio_stream, read_size, asyncio.get_running_loop(), read_kwargs=read_kwargs)
+        capture.start()
+        try:
+            await self._listen_loop(capture, resampler, vad, gate)
+        finally:
+            capture.stop()
 
+    async def _listen_loop(
+        self,
+        capture: MicCaptureThread,
+        resampler: StreamingResampler,
+        vad: VoiceActivityDetector,
+        gate: SilenceGate,
+    ):
         while True:
             if self.paused:
+                # The capture thread keeps draining the device; drop what it buffered while paused
+                capture.discard()
                 await asyncio.sleep(0.1)
                 continue
 
             try:
-                # Read enough frames to result in CHUNK_SIZE after resampling
-                read_size = int(CHUNK_SIZE * native_rate / SEND_SAMPLE_RATE)
-                raw_data = await asyncio.to_thread(self.audio_stream.read, read_size, **kwargs)
+                raw_data = await capture.read()
                 
                 # Resample to 16kHz for the API
-                data = self._resample_audio(raw_data, native_rate, SEND_SAMPLE_RATE)
-
-                if self.out_queue:
-                    await self.out_queue.put({"data": data, "mime_type": "audio/pcm"})
-
-                count = len(data) // 2
-                if count > 0:
-                    shorts = struct.unpack(f"<{count}h", data)
-                    sum_squares = sum(s**2 for s in shorts)
-                    rms = int(math.sqrt(sum_squares / count))
-                else:
-                    rms = 0
+                data = resampler.process(raw_data).tobytes()
 
-                if rms > VAD_THRESHOLD:
+                now = time.time()
+                edge = vad.process(data, now)
+                if edge == "start":
+                    self.latency.start_turn(now)
+                payload = None
+                for chunk in gate.process(data, vad, now):
+                    payload = {"data": chunk, "mime_type": "audio/pcm"}
+                    if self.out_queue:
+                        self.out_queue.put_audio(payload)
+                if vad.voiced and payload is not None:
+                    self.latency.voiced_chunk(payload, now)
+
+                if vad.voiced:
                     self.mark_user_activity()
-                    self._silence_start_time = None
-                    if not self._is_speaking:
-                        self._is_speaking = True
-                        print(f"[AI DEBUG] [VAD] Speech Detected (RMS: {rms}). Sending Video Frame.")
-                        if self._latest_image_payload and self.out_queue:
-                            await self.out_queue.put(self._latest_image_payload)
-                        else:
-                            print(f"[AI DEBUG] [VAD] No video frame available to send.")
-                else:
-                    if self._is_speaking:
-                        if self._silence_start_time is None:
-                            self._silence_start_time = time.time()
-                        elif time.time() - self._silence_start_time > SILENCE_DURATION:
-                            print("[AI DEBUG] [VAD] Silence detected. Resetting speech state.")
-                            self._is_speaking = False
-                            self._silence_start_time = None
+                if edge == "start":
+                    self._is_speaking = True
+                    print(f"[AI DEBUG] [VAD] Speech Detected (RMS: {vad.rms:.0f}, floor: {vad.noise_floor:.0f}). Sending Video Frame.")
+                    if (self._image_from_screen or self._latest_image_payload) and self.out_queue:
+                        # The screen frame is encoded in the pool; keep reading audio meanwhile
+                        task = asyncio.create_task(self.send_frame_now())
+                        self._frame_tasks.add(task)
+                        task.add_done_callback(self._frame_tasks.discard)
+                    else:
+                        print(f"[AI DEBUG] [VAD] No video frame available to send.")
+                elif edge == "end":
+                    print("[AI DEBUG] [VAD] Silence detected. Resetting speech state.")
+                    self._is_speaking = False
 
             except Exception as e:
                 print(f"Error reading audio: {e}")
@@ -2077,10 +2506,13 @@ class AudioLoop:
                 async for response in turn:
                     if data := response.data:
                         self.audio_in_queue.put_nowait(data)
+                        self.latency.mark_first("first_response")
 
                     if response.server_content:
                         if response.server_content.input_transcription:
                             transcript = response.server_content.input_transcription.text
+                            if transcript:
+                                self.latency.mark_first("first_transcript")
                             if transcript and transcript != self._last_input_transcription:
                                 is_correction = False
                                 delta = transcript
@@ -2183,6 +2615,12 @@ class AudioLoop:
                                         self.chat_buffer["text"] += delta
 
                         if response.server_content.turn_complete:
+                            record = self.latency.complete_turn()
+                            if record:
+                                print(
+                                    f"[AI DEBUG] [LATENCY] speech end -> first response {record.get('first_response')}ms, "
+                                    f"first playback {record.get('first_playback')}ms"
+                                )
                             self._ai_turn_open = False
                             self.flush_chat()
                             if self._pending_system_messages:
@@ -2219,6 +2657,7 @@ class AudioLoop:
                                 "notes_append",
                                 "memory_add_entry",
                                 "memory_search",
+                                "search_history",
                                 "memory_get_page",
                                 "memory_create_page",
                                 "memory_append_page",
@@ -2352,6 +2791,7 @@ class AudioLoop:
                                     in_seconds = fc.args.get("in_seconds")
                                     speak = fc.args.get("speak", True)
                                     alert = fc.args.get("alert", True)
+                                    recurrence = fc.args.get("recurrence")
 
                                     try:
                                         rem = self.reminder_manager.create(
@@ -2361,11 +2801,13 @@ class AudioLoop:
                                             in_seconds=in_seconds,
                                             speak=speak,
                                             alert=alert,
+                                            recurrence=recurrence,
                                         )
                                         result_str = (
                                             f"Reminder created. ID: {rem.id}\n"
                                             f"When: {rem.when_iso}\n"
-                                            f"Speak: {rem.speak}\n"
+                                            + (f"Repeats: {describe_recurrence(rem.recurrence)}\n" if rem.recurrence else "")
+                                            + f"Speak: {rem.speak}\n"
                                             f"Alert: {getattr(rem, 'alert', True)}\n"
                                             f"Message: {rem.message}"
                                         )
@@ -2380,7 +2822,9 @@ class AudioLoop:
                                         result_str = "No reminders scheduled."
                                     else:
                                         lines = [
-                                            f"{r.id} | {r.when_iso} | speak={r.speak} | alert={getattr(r, 'alert', True)} | {r.message}"
+                                            f"{r.id} | {r.when_iso} | speak={r.speak} | alert={getattr(r, 'alert', True)} | "
+                                            + (f"repeats {describe_recurrence(r.recurrence)} | " if r.recurrence else "")
+                                            + r.message
                                             for r in items
                                         ]
                                         result_str = "Scheduled reminders:\n" + "\n".join(lines)
@@ -2654,6 +3098,25 @@ class AudioLoop:
                                             result_str = f"Error searching memory: {e}"
                                     function_responses.append(types.FunctionResponse(id=fc.id, name=fc.name, response={"result": result_str}))
 
+                                elif fc.name == "search_history":
+                                    try:
+                                        query = fc.args.get("query") or ""
+                                        limit = int(fc.args.get("limit", 10))
+                                        results = self.session_manager.search_history(
+                                            query=query,
+                                            since=fc.args.get("since"),
+                                            until=fc.args.get("until"),
+                                            limit=limit,
+                                        )
+                                        if not results:
+                                            result_str = "No matching conversation turns found."
+                                        else:
+                                            lines = [f"- {r['time_iso']} [{r['sender']}] {r['text']}" for r in results]
+                                            result_str = "Conversation history matches:\n" + "\n".join(lines)
+                                    except Exception as e:
+                                        result_str = f"Error searching history: {e}"
+                                    function_responses.append(types.FunctionResponse(id=fc.id, name=fc.name, response={"result": result_str}))
+
                                 elif fc.name == "memory_get_page":
                                     result_str = "Memory engine not initialized."
                                     if getattr(self, "memory_engine", None):
@@ -2796,9 +3259,12 @@ class AudioLoop:
                                             summary=summary,
                                             start_iso=start_iso,
                                             end_iso=end_iso,
-                                            description=fc.args.get("description")
+                                            description=fc.args.get("description"),
+                                            recurrence=fc.args.get("recurrence"),
                                         )
                                         result_str = f"Event '{event.summary}' created with ID {event.id}."
+                                        if event.recurrence:
+                                            result_str += f" Repeats {describe_recurrence(event.recurrence)}."
                                     except Exception as e:
                                         result_str = f"Error creating event: {e}"
                                     function_responses.append(types.FunctionResponse(id=fc.id, name=fc.name, response={"result": result_str}))
@@ -2813,9 +3279,6 @@ class AudioLoop:
                                             result_str = "No events found in that time range."
                                         else:
                                             result_str = "Found events:\n" + "\n".join([f"- ID: {e.id}, Start: {e.start_iso}, Summary: {e.summary}" for e in events])
-                                        # Also send structured data to UI
-                                        if self.on_calendar_update:
-                                            self.on_calendar_update([e.__dict__ for e in events])
                                     except Exception as e:
                                         result_str = f"Error listing events: {e}"
                                     function_responses.append(types.FunctionResponse(id=fc.id, name=fc.name, response={"result": result_str}))
@@ -2838,7 +3301,76 @@ class AudioLoop:
             traceback.print_exc()
             raise e
 
+    def _make_playback_engine(self, write_fn) -> PlaybackEngine:
+        loop = asyncio.get_running_loop()
+
+        def _on_played(block: bytes):
+            if block:
+                self.latency.mark_first("first_playback")
+            # Output thread -> event loop; visualizer callbacks emit over Socket.IO
+            if self.on_audio_data:
+                try:
+                    loop.call_soon_threadsafe(self.on_audio_data, block)
+                except RuntimeError:
+                    pass
+
+        target_ms = settings_service.get_int("playback.target_ms", 120, 0, 2000)
+        device_chunk_ms = settings_service.get_int("playback.device_chunk_ms", 40, 5, 500)
+
+        def _on_underrun(count: int):
+            if count == 1 or count % 20 == 0:
+                print(f"[AI DEBUG] [AUDIO] Playback underrun (total {count}); consider raising playback.target_ms.")
+
+        return PlaybackEngine(
+            write_fn,
+            RECEIVE_SAMPLE_RATE,
+            target_ms=target_ms,
+            device_chunk_ms=device_chunk_ms,
+            on_underrun=_on_underrun,
+            on_played=_on_played,
+        )
+
+    async def _feed_playback(self, engine: PlaybackEngine, close_output: Optional[Callable[[], Any]] = None) -> Optional[BaseException]:
+        """
+        Moves model audio into the engine until its output thread fails; returns the error.
+        close_output (the device stream's close) runs only after the output thread has
+        exited, so it never races a stream.write in progress.
+        """
+        self.playback = engine
+        engine.start()
+        try:
+            while True:
+                bytestream = await self.audio_in_queue.get()
+                if engine.error is not None:
+                    return engine.error
+                engine.feed(bytestream)
+                self.mark_ai_activity()
+        finally:
+            if self.playback is engine:
+                self.playback = None
+            engine.flush()
+            # Joined off the event loop; a write may still be blocking in the device
+            stopped = await asyncio.to_thread(engine.close, 2.0)
+            if close_output is not None:
+                if stopped:
+                    try:
+                        await asyncio.to_thread(close_output)
+                    except Exception:
+                        pass
+                else:
+                    print("[AI DEBUG] [AUDIO] Playback thread did not stop; leaving the output stream open.")
+            if engine.writes:
+                print(
+                    f"[AI DEBUG] [AUDIO] Playback stopped: {engine.writes} writes, "
+                    f"{engine.underruns} underruns, max depth {engine.max_depth_ms:.0f}ms"
+                )
+
     async def play_audio(self):
+        if self.replay_session_path:
+            # Offline replay: no output device, but keep real-time pacing
+            await self._feed_playback(self._make_playback_engine(null_speaker_write(RECEIVE_SAMPLE_RATE)))
+            return
+
         async def _play_with_sounddevice():
             if not _SOUNDDEVICE_AVAILABLE:
                 return False
@@ -2854,23 +3386,11 @@ class AudioLoop:
                 print(f"[AI DEBUG] [AUDIO] SoundDevice init failed: {e}")
                 return False
 
-            while True:
-                bytestream = await self.audio_in_queue.get()
-                if self.on_audio_data:
-                    self.on_audio_data(bytestream)
-                try:
-                    await asyncio.to_thread(stream.write, bytestream)
-                except Exception as e:
-                    print(f"[AI DEBUG] [AUDIO] SoundDevice playback error: {e}")
-                    if self.on_error:
-                        self.on_error("Audio playback disabled (SoundDevice). Text output still works.")
-                    break
-                self.mark_ai_activity()
-
-            try:
-                stream.close()
-            except Exception:
-                pass
+            error = await self._feed_playback(self._make_playback_engine(stream.write), stream.close)
+            if error is not None:
+                print(f"[AI DEBUG] [AUDIO] SoundDevice playback error: {error}")
+                if self.on_error:
+                    self.on_error("Audio playback disabled (SoundDevice). Text output still works.")
             return True
 
         def _open_output():
@@ -2894,30 +3414,18 @@ class AudioLoop:
                 self.on_error("Audio output failed to initialize. Output audio disabled.")
             return
 
-        while True:
-            bytestream = await self.audio_in_queue.get()
-            if self.on_audio_data:
-                self.on_audio_data(bytestream)
-            try:
-                await asyncio.to_thread(stream.write, bytestream)
-            except SystemError as e:
-                print(f"[AI DEBUG] [AUDIO] Playback error (PyAudio): {e}")
-                if await _play_with_sounddevice():
-                    return
-                if self.on_error:
-                    self.on_error("Audio playback disabled due to PyAudio error. Text output still works.")
-                break
-            except Exception as e:
-                print(f"[AI DEBUG] [AUDIO] Playback error: {e}")
-                if self.on_error:
-                    self.on_error("Audio playback disabled due to output error. Text output still works.")
-                break
-            self.mark_ai_activity()
+        error = await self._feed_playback(self._make_playback_engine(stream.write), stream.close)
 
-        try:
-            stream.close()
-        except Exception:
-            pass
+        if isinstance(error, SystemError):
+            print(f"[AI DEBUG] [AUDIO] Playback error (PyAudio): {error}")
+            if await _play_with_sounddevice():
+                return
+            if self.on_error:
+                self.on_error("Audio playback disabled due to PyAudio error. Text output still works.")
+        elif error is not None:
+            print(f"[AI DEBUG] [AUDIO] Playback error: {error}")
+            if self.on_error:
+                self.on_error("Audio playback disabled due to output error. Text output still works.")
 
     async def get_frames(self):
         cap = None
@@ -2949,122 +3457,175 @@ class AudioLoop:
 
             frame = await asyncio.to_thread(self._get_frame, cap)
             if frame is not None:
-                await self._enqueue_frame(frame)
+                # Resize + JPEG run in the encode pool; None means the frame was dropped
+                encoded = await self.image_encoder.encode(
+                    frame,
+                    "jpeg",
+                    self.camera_capture.get("jpeg_quality", 80),
+                    self.camera_capture.get("max_size"),
+                )
+                if encoded is not None:
+                    await self._enqueue_frame({"mime_type": encoded[0], "data": encoded[1]})
             await asyncio.sleep(self._camera_interval)
 
     def _get_frame(self, cap):
+        """Raw BGR camera frame, or None."""
         ret, frame = cap.read()
         if not ret:
             return None
-
-        max_size = self.camera_capture.get("max_size")
-        if max_size:
-            h, w = frame.shape[:2]
-            if h > 0 and w > 0:
-                scale = min(max_size / w, max_size / h)
-                if scale < 1.0:
-                    new_w = int(w * scale)
-                    new_h = int(h * scale)
-                    frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
-
-        quality = self.camera_capture.get("jpeg_quality", 80)
-        params = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
-        ret, buf = cv2.imencode(".jpg", frame, params)
-        if ret:
-            return {"mime_type": "image/jpeg", "data": buf.tobytes()}
-        return None
-
-    def _grab_screen(self):
+        return frame
+
+    def _grab_screen(self, force: bool = False):
+        """
+        Returns (changed, ui_update); changed is None on error. Changed frames are folded
+        into screen_frame tile by tile. The full image is encoded in the encode pool
+        (see _apply_screen_capture); the UI gets just the dirty tiles (rate-limited).
+        """
         try:
-            # Use context manager to ensure thread safety with asyncio.to_thread
-            with mss.mss() as sct:
-                region = self.screen_capture.get("region")
-                if region:
-                    monitor = region
-                else:
-                    monitors = sct.monitors
-                    monitor_idx = self.screen_capture.get("monitor", 1)
-                    if monitors:
-                        if monitor_idx == 0:
-                            monitor = monitors[0]
-                        elif 0 < monitor_idx < len(monitors):
-                            monitor = monitors[monitor_idx]
-                        else:
-                            monitor = monitors[1] if len(monitors) > 1 else monitors[0]
-                    else:
-                        monitor = {"left": 0, "top": 0, "width": 1280, "height": 720}
-
-                shot = sct.grab(monitor)
-                img_np = np.array(shot)
-
-                max_size = self.screen_capture.get("max_size")
-                if max_size:
-                    h, w = img_np.shape[:2]
-                    if h > 0 and w > 0:
-                        scale = min(max_size / w, max_size / h)
-                        if scale < 1.0:
-                            new_w = int(w * scale)
-                            new_h = int(h * scale)
-                            img_np = cv2.resize(img_np, (new_w, new_h), interpolation=cv2.INTER_AREA)
-
-                # Convert BGRA to BGR for JPEG/PNG encoding
-                img_bgr = cv2.cvtColor(img_np, cv2.COLOR_BGRA2BGR)
-                img_gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-
-                fmt = self.screen_capture.get("format", "jpeg")
-                ext = ".png" if fmt == "png" else ".jpg"
-                
-                params = []
-                if fmt == "png":
-                    params = [int(cv2.IMWRITE_PNG_COMPRESSION), 3]
-                    mime = "image/png"
-                else:
-                    quality = self.screen_capture.get("jpeg_quality", 85)
-                    params = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
-                    mime = "image/jpeg"
+            img_bgr, img_gray = self.screen_grabber.capture(self.screen_capture)
+            changed = self.screen_motion.changed(img_gray)
+            if changed or force:
+                self.screen_frame.update(img_bgr)
 
-                ret, buf = cv2.imencode(ext, img_bgr, params)
-                if ret:
-                    return {"mime_type": mime, "data": buf.tobytes()}, img_gray
-                return None, None
+            ui_update = None
+            now = time.time()
+            if self.on_video_frame and (now - self._last_ui_frame_ts) >= 0.15:
+                ui_update = self.screen_frame.take_ui_update(self.screen_capture, defer_keyframe=True)
+                if ui_update is not None:
+                    self._last_ui_frame_ts = now
+            return changed, ui_update
 
         except Exception as e:
+            # Monitor layout may have changed; re-create the grabber on the next frame
+            self.screen_grabber.reset()
             now = time.time()
             if (now - self._last_screen_error_ts) > 3.0:
                 self._last_screen_error_ts = now
                 print(f"[AI DEBUG] [SCREEN] Capture error: {e}")
             return None, None
 
+    async def _capture_screen(self, force: bool = False):
+        """Runs _grab_screen on the capture thread that owns the long-lived grabber."""
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._screen_executor, self._grab_screen, force)
+        except RuntimeError:
+            # Executor already shut down by stop()
+            return None, None
+
+    def _submit_screen_encode(self):
+        """
+        Starts (or joins) the encode of the current screen composite in the encode pool;
+        the result is cached on screen_frame, so _latest_image_payload does not have to
+        encode on the event loop. Returns the future, or None if there is no frame.
+        """
+        pending = self._screen_encode
+        if pending is not None and pending[0] == self.screen_frame.generation and not pending[1].done():
+            return pending[1]
+        fmt = self.screen_capture.get("format", "jpeg")
+        quality = self.screen_capture.get("jpeg_quality", 85)
+        future, generation = self.screen_frame.submit_full(
+            lambda composite: self.image_encoder.submit(composite, fmt, quality)
+        )
+        if future is None:
+            return None
+
+        def _store(f, frame=self.screen_frame, generation=generation):
+            encoded = f.result()
+            if encoded is not None:
+                frame.store_full(generation, encoded)
+
+        future.add_done_callback(_store)
+        self._screen_encode = (generation, future)
+        return future
+
+    async def _encode_screen_frame(self):
+        """
+        Encodes the current screen composite in the pool ahead of a read of
+        _latest_image_payload. Only consumers (speech start, text input, OCR, send_frame_now)
+        call this, so frames nobody reads are never encoded.
+        """
+        if not self._image_from_screen or self.screen_frame.cached_full() is not None:
+            return
+        future = self._submit_screen_encode()
+        if future is not None:
+            try:
+                await future
+            except Exception:
+                pass
+
+    async def _apply_screen_capture(self, changed: Optional[bool], ui_update: Optional[dict]) -> bool:
+        if changed is None:
+            return False
+        # The composite is current as of now, whether or not anything changed
+        self._image_from_screen = True
+        self._latest_image_ts = time.time()
+        if ui_update is not None and ui_update["kind"] == "keyframe":
+            full = self.screen_frame.cached_full()
+            if full is None:
+                future = self._submit_screen_encode()
+                full = await future if future is not None else None
+            if full is None:
+                # Dropped under load; send a keyframe with the next UI update instead
+                self.screen_frame.request_keyframe()
+                ui_update = None
+            else:
+                ui_update = {"kind": "full", "mime_type": full[0], "data": full[1]}
+        if ui_update is not None and self.on_video_frame:
+            try:
+                if ui_update["kind"] == "full":
+                    self.on_video_frame(
+                        {
+                            "data": base64.b64encode(ui_update["data"]).decode("utf-8"),
+                            "mime_type": ui_update["mime_type"],
+                            "source": "screen",
+                        }
+                    )
+                else:
+                    self.on_video_frame(dict(ui_update, source="screen"))
+            except Exception:
+                pass
+        return True
+
+    @property
+    def _latest_image_payload(self) -> Optional[dict]:
+        if self._image_from_screen:
+            # Usually already encoded by the pool (_encode_screen_frame); otherwise encodes
+            # here, and only if tiles changed since the last read
+            full = self.screen_frame.full_image(self.screen_capture)
+            if full is not None and full is not self._screen_payload_src:
+                self._screen_payload_src = full
+                self._image_payload = ImagePayload(full[0], full[1])
+        return self._image_payload
+
+    @_latest_image_payload.setter
+    def _latest_image_payload(self, payload: Optional[dict]):
+        self._image_payload = payload
+        self._image_from_screen = False
+
     async def get_screen(self):
-        last_gray = None
         idle_interval = 2.0  # Slow down to 0.5 FPS when static
         current_interval = self._screen_interval
 
         while True:
             if self.paused or self.video_mode != "screen":
+                # The cached payload may now be a camera frame; rebuild from a fresh screen frame
+                self.screen_motion.reset()
+                self.screen_frame.reset()
                 await asyncio.sleep(0.2)
                 continue
 
             start_ts = time.time()
-            frame, gray = await asyncio.to_thread(self._grab_screen)
+            changed, ui_update = await self._capture_screen()
             
-            if frame is not None:
+            if await self._apply_screen_capture(changed, ui_update):
                 self._screen_fail_count = 0
-                await self._enqueue_frame(frame)
-
-                # Dynamic FPS: Check for motion
-                active_interval = self._screen_interval
-                if last_gray is not None and gray is not None and last_gray.shape == gray.shape:
-                    score = np.mean(cv2.absdiff(last_gray, gray))
-                    if score > 0.5:  # Threshold for activity
-                        current_interval = active_interval
-                    else:
-                        # Exponential backoff to idle
-                        current_interval = min(current_interval * 1.5, idle_interval)
+
+                # Dynamic FPS: motion was already checked on the thumbnail
+                if changed:
+                    current_interval = self._screen_interval
                 else:
-                    current_interval = active_interval
-                
-                last_gray = gray
+                    # Exponential backoff to idle
+                    current_interval = min(current_interval * 1.5, idle_interval)
             else:
                 self._screen_fail_count += 1
                 if self._screen_fail_count >= 10:
@@ -3075,6 +3636,24 @@ class AudioLoop:
             elapsed = time.time() - start_ts
             await asyncio.sleep(max(0.01, current_interval - elapsed))
 
+    @contextlib.asynccontextmanager
+    async def _live_session(self, live_config):
+        """Live API session, or a local replay of a recording; optionally recorded."""
+        if self.replay_session_path:
+            connect = fake_connect(self.replay_session_path)
+        else:
+            connect = client.aio.live.connect
+        async with connect(model=MODEL, config=live_config) as session:
+            if not self.record_session_path:
+                yield session
+                return
+            path = Path(self.record_session_path)
+            if path.exists():
+                # Keep earlier recordings (reconnects open a new session)
+                path = path.with_name(f"{path.stem}-{int(time.time())}{path.suffix}")
+            async with recording(session, path) as recorded:
+                yield recorded
+
     async def run(self, start_message=None):
         retry_delay = 1
         is_reconnect = False
@@ -3097,13 +3676,13 @@ class AudioLoop:
                     )
 
                 async with (
-                    client.aio.live.connect(model=MODEL, config=current_config) as session,
+                    self._live_session(current_config) as session,
                     asyncio.TaskGroup() as tg,
                 ):
                     self.session = session
 
                     self.audio_in_queue = asyncio.Queue()
-                    self.out_queue = asyncio.Queue(maxsize=100)
+                    self.out_queue = OutboundScheduler()
 
                     tg.create_task(self.send_realtime())
                     tg.create_task(self.listen_audio())
@@ -0,0 +1,104 @@
+import asyncio
+import collections
+from typing import Any, Dict, Optional, Tuple
+
+AUDIO = "audio"
+TEXT = "text"
+IMAGE = "image"
+LANES = (AUDIO, TEXT, IMAGE)
+
+
+class OutboundScheduler:
+    """
+    Realtime messages waiting for session.send, split into priority lanes.
+
+    - audio: FIFO, never dropped and always sent first, so mic latency only depends on
+      how fast the session accepts audio, not on what else is queued.
+    - text: FIFO between audio and images; bounded by `text_max`, oldest dropped first.
+    - image: a single latest-only slot; a newer frame replaces one that was not sent yet.
+
+    put_*() never block, so producers (the mic loop, frame grabbers) are not stalled by a
+    slow session. stats() exposes per-lane depth and enqueue/send/drop counters.
+    """
+
+    def __init__(self, text_max: int = 64, audio_warn_depth: int = 50):
+        self._audio: collections.deque = collections.deque()
+        self._text: collections.deque = collections.deque()
+        self._image: Optional[dict] = None
+        self.text_max = max(1, int(text_max))
+        self.audio_warn_depth = max(1, int(audio_warn_depth))
+        self._ready = asyncio.Event()
+        self._counters: Dict[str, Dict[str, int]] = {
+            lane: {"enqueued": 0, "sent": 0, "dropped": 0, "max_depth": 0} for lane in LANES
+        }
+        self._audio_warned = False
+
+    # --- Producers ---
+    def put_audio(self, payload: dict):
+        self._audio.append(payload)
+        self._count(AUDIO, len(self._audio))
+        if len(self._audio) >= self.audio_warn_depth and not self._audio_warned:
+            self._audio_warned = True
+            print(f"[AI DEBUG] [SEND] Outbound audio backlog at {len(self._audio)} chunks; session send is slow.")
+        self._ready.set()
+
+    def put_text(self, msg: Any, end_of_turn: bool = False):
+        if len(self._text) >= self.text_max:
+            self._text.popleft()
+            self._counters[TEXT]["dropped"] += 1
+        self._text.append((msg, end_of_turn))
+        self._count(TEXT, len(self._text))
+        self._ready.set()
+
+    def put_image(self, payload: dict) -> bool:
+        """Queues `payload` as the next frame; returns False if it replaced an unsent one."""
+        replaced = self._image is not None
+        if replaced:
+            self._counters[IMAGE]["dropped"] += 1
+        self._image = payload
+        self._count(IMAGE, 1)
+        self._ready.set()
+        return not replaced
+
+    def _count(self, lane: str, depth: int):
+        c = self._counters[lane]
+        c["enqueued"] += 1
+        if depth > c["max_depth"]:
+            c["max_depth"] = depth
+
+    # --- Consumer ---
+    def get_nowait(self) -> Optional[Tuple[str, Any, bool]]:
+        """Highest-priority pending item as (lane, msg, end_of_turn), or None."""
+        if self._audio:
+            item = (AUDIO, self._audio.popleft(), False)
+            if not self._audio:
+                self._audio_warned = False
+        elif self._text:
+            msg, end_of_turn = self._text.popleft()
+            item = (TEXT, msg, end_of_turn)
+        elif self._image is not None:
+            item = (IMAGE, self._image, False)
+            self._image = None
+        else:
+            return None
+        self._counters[item[0]]["sent"] += 1
+        return item
+
+    async def get(self) -> Tuple[str, Any, bool]:
+        while True:
+            item = self.get_nowait()
+            if item is not None:
+                return item
+            self._ready.clear()
+            await self._ready.wait()
+
+    # --- Introspection ---
+    def depth(self) -> Dict[str, int]:
+        return {AUDIO: len(self._audio), TEXT: len(self._text), IMAGE: int(self._image is not None)}
+
+    def empty(self) -> bool:
+        return not self._audio and not self._text and self._image is None
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        depth = self.depth()
+        return {lane: dict(self._counters[lane], depth=depth[lane]) for lane in LANES}
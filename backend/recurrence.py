@@ -0,0 +1,229 @@
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Iterator, Optional
+from zoneinfo import ZoneInfo
+
+# Small RRULE subset shared by recurring calendar events and reminders, expanded lazily.
+
+RECURRENCE_STEPS = {
+    "minutely": timedelta(minutes=1),
+    "hourly": timedelta(hours=1),
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+}
+WEEKDAY_CODES = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+
+# Zone key for "the OS local time zone" (time_settings mode=system has no IANA name)
+LOCAL_ZONE = "local"
+
+# Day-based rules keep their local wall-clock time; shorter ones step in absolute time
+_WALL_CLOCK_FREQS = ("daily", "weekly")
+
+
+def parse_iso(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def parse_recurrence(value) -> Optional[dict]:
+    """
+    Normalizes a recurrence rule to {"freq", "interval", "byweekday"?, "count"?, "until"?}.
+    Accepts a dict with those keys, a bare frequency ("daily", "weekly", ...) or an
+    RRULE-style string such as "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;COUNT=10".
+    Raises ValueError on anything it cannot honour.
+    """
+    if value is None or value == "" or value == {}:
+        return None
+    if isinstance(value, str):
+        text = value.strip()
+        if text.upper().startswith("RRULE:"):
+            text = text[6:]
+        if "=" not in text:
+            raw = {"freq": text}
+        else:
+            raw = {}
+            for part in text.split(";"):
+                if not part.strip():
+                    continue
+                key, _, val = part.partition("=")
+                raw[key.strip().lower()] = val.strip()
+            if "byday" in raw:
+                raw["byweekday"] = raw.pop("byday").split(",")
+    elif isinstance(value, dict):
+        raw = dict(value)
+    else:
+        raise ValueError(f"Unsupported recurrence: {value!r}")
+
+    freq = str(raw.get("freq") or "").strip().lower()
+    if freq not in RECURRENCE_STEPS:
+        raise ValueError(f"Unsupported recurrence frequency: {raw.get('freq')!r}")
+    interval = int(raw.get("interval") or 1)
+    if interval < 1:
+        raise ValueError("Recurrence interval must be >= 1.")
+    rule = {"freq": freq, "interval": interval}
+
+    byweekday = raw.get("byweekday")
+    if byweekday:
+        if isinstance(byweekday, str):
+            byweekday = byweekday.split(",")
+        days = set()
+        for d in byweekday:
+            if isinstance(d, int) or str(d).strip().isdigit():
+                d = int(d)
+                if not 0 <= d <= 6:
+                    raise ValueError(f"Invalid weekday: {d}")
+                days.add(d)
+            else:
+                code = str(d).strip().upper()[:2]
+                if code not in WEEKDAY_CODES:
+                    raise ValueError(f"Invalid weekday: {d!r}")
+                days.add(WEEKDAY_CODES[code])
+        if freq == "daily":
+            # FREQ=DAILY;BYDAY=... is the same series as a weekly rule on those days
+            if interval != 1:
+                raise ValueError("byweekday with a daily interval > 1 is not supported.")
+            rule["freq"] = "weekly"
+        elif freq != "weekly":
+            raise ValueError("byweekday is only supported for daily/weekly recurrences.")
+        rule["byweekday"] = sorted(days)
+
+    if raw.get("count") is not None:
+        count = int(raw["count"])
+        if count < 1:
+            raise ValueError("Recurrence count must be >= 1.")
+        rule["count"] = count
+    if raw.get("until"):
+        until = str(raw["until"])
+        if until[:8].isdigit() and "-" not in until:
+            # RRULE basic format: 20240131 or 20240131T235959[Z]
+            fmt = "%Y%m%dT%H%M%S" if "T" in until else "%Y%m%d"
+            parsed = datetime.strptime(until.rstrip("Z"), fmt)
+            until = (parsed.replace(tzinfo=timezone.utc) if until.endswith("Z") else parsed).isoformat()
+        parse_iso(until)
+        rule["until"] = until
+    return rule
+
+
+def resolve_zone(key: Optional[str]) -> Optional[tzinfo]:
+    """tzinfo for a stored zone key; None means the OS local time zone."""
+    if not key or key == LOCAL_ZONE:
+        return None
+    try:
+        return ZoneInfo(key)
+    except Exception:
+        print(f"[AI DEBUG] [TIME] Unknown series timezone {key!r}, using local time")
+        return None
+
+
+def _to_wall(dt: datetime, tz: Optional[tzinfo]) -> datetime:
+    """Aware datetime -> naive wall-clock time in `tz` (None: OS local)."""
+    return (dt.astimezone(tz) if tz is not None else dt.astimezone()).replace(tzinfo=None)
+
+
+def _from_wall(wall: datetime, tz: Optional[tzinfo]) -> datetime:
+    """
+    Naive wall-clock time in `tz` -> aware datetime. Ambiguous times (DST fall-back) take
+    the first occurrence; times in a spring-forward gap move forward by the gap.
+    """
+    if tz is None:
+        return wall.astimezone()
+    return wall.replace(tzinfo=tz).astimezone(timezone.utc).astimezone(tz)
+
+
+def _align_to(dt: datetime, ref: datetime) -> datetime:
+    """Makes `dt` comparable with `ref` (naive datetimes are treated as local time)."""
+    if (dt.tzinfo is None) == (ref.tzinfo is None):
+        return dt
+    if ref.tzinfo is None:
+        return dt.astimezone().replace(tzinfo=None)
+    return dt.astimezone(ref.tzinfo)
+
+
+def _iter_fixed(start: datetime, rule: dict, after: Optional[datetime], until: Optional[datetime]) -> Iterator[datetime]:
+    """Occurrences by plain datetime arithmetic on `start` (after/until already aligned)."""
+    interval = rule.get("interval", 1)
+    count = rule.get("count")
+
+    if rule["freq"] == "weekly" and rule.get("byweekday"):
+        days = rule["byweekday"]
+        week0 = start - timedelta(days=start.weekday())
+        period = timedelta(weeks=interval)
+        k = 0
+        emitted = 0
+        if after is not None and after > start:
+            k = (after - week0) // period
+            # Occurrences in the skipped periods (the first period only counts days on/after start)
+            emitted = k * len(days) - sum(1 for d in days if d < start.weekday()) if k > 0 else 0
+        while True:
+            week = week0 + k * period
+            for d in days:
+                occ = week + timedelta(days=d)
+                if occ < start:
+                    continue
+                if (count is not None and emitted >= count) or (until is not None and occ > until):
+                    return
+                emitted += 1
+                if after is not None and occ < after:
+                    continue
+                yield occ
+            k += 1
+    else:
+        step = RECURRENCE_STEPS[rule["freq"]] * interval
+        i = 0
+        if after is not None and after > start:
+            i = -((start - after) // step)  # ceil((after - start) / step)
+        while True:
+            if count is not None and i >= count:
+                return
+            occ = start + i * step
+            if until is not None and occ > until:
+                return
+            yield occ
+            i += 1
+
+
+def iter_occurrences(
+    start: datetime, rule: dict, after: Optional[datetime] = None, zone: Optional[str] = None
+) -> Iterator[datetime]:
+    """
+    Lazily yields occurrence starts of `rule` anchored at `start`, in order, beginning with the
+    first occurrence >= `after`. Skipping ahead is arithmetic, so the cost does not depend on
+    how far the window is from the anchor; infinite series are fine as long as the caller stops.
+
+    With a `zone` key (IANA name or LOCAL_ZONE) and an aware `start`, daily and weekly series
+    step in that zone's wall-clock time and every occurrence is re-localized, so a 09:00
+    series stays at 09:00 across DST changes. Without it, steps are added to `start` as is.
+    """
+    until = _align_to(parse_iso(rule["until"]), start) if rule.get("until") else None
+    if after is not None:
+        after = _align_to(after, start)
+
+    if zone is None or start.tzinfo is None or rule["freq"] not in _WALL_CLOCK_FREQS:
+        yield from _iter_fixed(start, rule, after, until)
+        return
+
+    tz = resolve_zone(zone)
+    # Skip ahead in wall-clock time with a day of slack (offsets differ by at most hours),
+    # then compare the real instants
+    wall_after = _to_wall(after, tz) - timedelta(days=1) if after is not None else None
+    for wall in _iter_fixed(_to_wall(start, tz), rule, wall_after, None):
+        occ = _from_wall(wall, tz)
+        if until is not None and occ > until:
+            return
+        if after is not None and occ < after:
+            continue
+        yield occ
+
+
+def describe_recurrence(rule: Optional[dict]) -> str:
+    if not rule:
+        return ""
+    unit = {"minutely": "minute", "hourly": "hour", "daily": "day", "weekly": "week"}[rule["freq"]]
+    interval = rule.get("interval", 1)
+    text = f"every {unit}" if interval == 1 else f"every {interval} {unit}s"
+    if rule.get("byweekday"):
+        names = {v: k for k, v in WEEKDAY_CODES.items()}
+        text += " on " + ",".join(names[d] for d in rule["byweekday"])
+    if rule.get("count"):
+        text += f", {rule['count']} times"
+    if rule.get("until"):
+        text += f", until {rule['until']}"
+    return text
@@ -0,0 +1,111 @@
+"""
+Headless replay of a recorded Live session, for repeatable latency benchmarks.
+
+    python replay_runner.py recording.bin.gz [--data-dir DIR] [--timeout SEC] [--json out.json]
+
+AudioLoop runs against FakeLiveSession with the recorded mic audio and a null speaker.
+It uses a throwaway data directory (an empty temp dir unless --data-dir is given), so
+replayed tool calls never touch the real data/ directory. Tools that reach outside the
+process (smart home, web agent, weather) are denied. The report (latency percentiles,
+outbound stats, what the client sent) is printed as JSON.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Tools with side effects outside the data directory; denied during replay
+EXTERNAL_TOOLS = {"run_web_agent", "list_smart_devices", "control_light", "get_weather"}
+
+
+async def replay(path, drain_sec: float = 1.0, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Replays `path` through AudioLoop and returns the report. MONIKAI_DATA_DIR must be set
+    before monikai is first imported (run_replay does that).
+    """
+    import monikai
+
+    audio_loop = None
+
+    def _confirm(request):
+        allowed = request.get("tool") not in EXTERNAL_TOOLS
+        asyncio.get_running_loop().call_soon(audio_loop.resolve_tool_confirmation, request["id"], allowed)
+
+    audio_loop = monikai.AudioLoop(video_mode="none", replay_session_path=str(path), on_tool_confirmation=_confirm)
+    started = time.monotonic()
+    task = asyncio.create_task(audio_loop.run())
+    try:
+        deadline = None if timeout is None else started + timeout
+        while True:
+            session = getattr(audio_loop, "session", None)
+            done = getattr(session, "done", None)
+            if done is not None and done.is_set():
+                break
+            if task.done():
+                task.result()
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Replay did not finish within {timeout}s")
+            await asyncio.sleep(0.05)
+        # Let the last turn play out (null speaker keeps real-time pacing)
+        quiet_since = None
+        while quiet_since is None or time.monotonic() - quiet_since < drain_sec:
+            playback = audio_loop.playback
+            busy = (audio_loop.audio_in_queue is not None and not audio_loop.audio_in_queue.empty()) or (
+                playback is not None and playback.depth_ms() > 0
+            )
+            quiet_since = None if busy else (quiet_since or time.monotonic())
+            if deadline is not None and time.monotonic() > deadline:
+                break
+            await asyncio.sleep(0.05)
+        session = audio_loop.session
+        return {
+            "recording": str(path),
+            "wall_sec": round(time.monotonic() - started, 3),
+            "latency": audio_loop.get_latency_metrics(),
+            "outbound": audio_loop.get_outbound_stats(),
+            "sent": dict(getattr(session, "sent", {})),
+            "tool_responses": len(getattr(session, "tool_responses", [])),
+        }
+    finally:
+        audio_loop.stop()
+        task.cancel()
+        try:
+            await task
+        except BaseException:
+            pass
+
+
+def run_replay(path, data_dir=None, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Runs a replay in a fresh event loop with an isolated data directory."""
+    if "monikai" in sys.modules:
+        raise RuntimeError("run_replay must run before monikai is imported (its data dir is fixed at import)")
+    with tempfile.TemporaryDirectory(prefix="monikai-replay-") as tmp:
+        os.environ["MONIKAI_DATA_DIR"] = str(Path(data_dir) if data_dir else Path(tmp))
+        # The GenAI client is created at import; replay never talks to the API
+        os.environ.setdefault("GEMINI_API_KEY", "offline-replay")
+        return asyncio.run(replay(path, timeout=timeout))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded Live session offline.")
+    parser.add_argument("recording", help="file written with MONIKAI_RECORD_SESSION")
+    parser.add_argument("--data-dir", default=None, help="data directory to use (default: empty temp dir)")
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument("--json", default=None, help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = run_replay(args.recording, data_dir=args.data_dir, timeout=args.timeout)
+    text = json.dumps(report, indent=2, default=str)
+    print(text)
+    if args.json:
+        Path(args.json).write_text(text, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,7 @@ import threading
 import sys
 import os
 import base64
+import copy
 import json
 import time
 import re
@@ -40,6 +41,9 @@ from dataclasses import asdict
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 import monikai
+from audio_dsp import VisualizerConfig, VisualizerFeed
+from image_encoder import ImagePayload
+from settings_service import get_settings_service
 from authenticator import FaceAuthenticator
 from kasa_agent import KasaAgent
 
@@ -89,6 +93,28 @@ def _determine_sprite(state_dict: dict) -> str:
 
 MAIN_LOOP = None
 
+
+def _emit_calendar_update(delta: dict):
+    """
+    CalendarManager on_update: edits go out as versioned calendar_delta messages; only a
+    reset (load, holiday/birthday changes) resends the snapshot. Safe from any thread.
+    """
+    if not calendar_manager:
+        return
+
+    async def _emit():
+        if delta.get('reset'):
+            await sio.emit('calendar_data', calendar_manager.snapshot())
+        else:
+            await sio.emit('calendar_delta', delta)
+    try:
+        if MAIN_LOOP and MAIN_LOOP.is_running():
+            asyncio.run_coroutine_threadsafe(_emit(), MAIN_LOOP)
+        else:
+            asyncio.create_task(_emit())
+    except Exception as e:
+        print(f"[SERVER] Failed to emit calendar update: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Code to run on startup
@@ -115,12 +141,7 @@ async def lifespan(app: FastAPI):
     user_memory_dir.mkdir(parents=True, exist_ok=True)
 
     # 1. Calendar
-    def on_calendar_update_server():
-        if calendar_manager:
-            events = [e.__dict__ for e in calendar_manager.get_all_events()]
-            asyncio.create_task(sio.emit('calendar_data', events))
-    
-    calendar_manager = monikai.CalendarManager(storage_dir=user_memory_dir, on_update=on_calendar_update_server)
+    calendar_manager = monikai.CalendarManager(storage_dir=user_memory_dir, on_update=_emit_calendar_update)
     calendar_manager.load()
     print("[SERVER] Calendar Manager initialized.")
 
@@ -222,6 +243,8 @@ BASE_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = BASE_DIR.parent / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 SETTINGS_FILE = DATA_DIR / "settings.json"
+# Shared with monikai.py: one parsed, cached copy of settings.json per process
+settings_service = get_settings_service(SETTINGS_FILE)
 STUDY_DIR = DATA_DIR / "study"
 last_start_params = {}
 
@@ -262,6 +285,38 @@ DEFAULT_SETTINGS = {
         "region": None,
         "mode": "continuous"
     },
+    "vad": { # microphone voice activity detection
+        "detector": "energy", # energy | energy_zcr | spectral
+        "threshold": 800, # minimum RMS (int16) that counts as speech
+        "adaptive": True, # raise the threshold above the tracked noise floor
+        "snr_on": 3.0,
+        "snr_off": 2.0,
+        "silence_sec": 1.2
+    },
+    "visualizer": { # model audio sent to the frontend visualizer
+        "mode": "envelope", # envelope | pcm | off
+        "bins": 64,
+        "max_fps": 30
+    },
+    "silence_suppression": { # stop streaming the mic while nobody is talking (opt-in)
+        "enabled": False, # gated by the local VAD threshold; quiet speech it misses is dropped
+        "hangover_sec": 2.0, # keep sending this long after speech ends
+        "preroll_ms": 300, # audio sent ahead of a speech onset
+        "keepalive_sec": 0 # >0: send a silent chunk this often while suppressed
+    },
+    "playback": { # speaker output jitter buffer
+        "target_ms": 120, # audio buffered before playback starts
+        "device_chunk_ms": 40 # size of each write to the output device
+    },
+    "image_encoding": { # camera / screen frame encoding off the audio threads
+        "process_pool": True, # encode in worker processes (False: one background thread)
+        "workers": 1,
+        "max_pending": 2 # frames waiting for a worker; the oldest is dropped beyond this
+    },
+    "session_archive": { # pack old data/sessions day directories into monthly zips
+        "enabled": True,
+        "after_days": 30
+    },
     "proactivity": {
         "idle_nudges": {
             "enabled": True,
@@ -339,6 +394,8 @@ def _get_latest_screen_bytes():
     payload = getattr(audio_loop, "_latest_image_payload", None)
     if not payload or not isinstance(payload, dict):
         return None
+    if isinstance(payload, ImagePayload):
+        return payload.raw
     data = payload.get("data")
     if not data:
         return None
@@ -439,39 +496,43 @@ async def _debounced_screen_ocr():
         return
     await _maybe_send_screen_ocr(text)
 
+def _merge_settings(loaded):
+    # SETTINGS is mutated in place by handlers; never alias the shared cached snapshot
+    loaded = copy.deepcopy(loaded)
+    # Merge with defaults to ensure new keys exist
+    # Deep merge for tool_permissions would be better but shallow merge of top keys + tool_permissions check is okay for now
+    for k, v in loaded.items():
+        if k == "tool_permissions" and isinstance(v, dict):
+             SETTINGS["tool_permissions"].update(v)
+        elif k == "proactivity" and isinstance(v, dict):
+            for pk, pv in v.items():
+                if pk == "idle_nudges" and isinstance(pv, dict):
+                    SETTINGS["proactivity"]["idle_nudges"].update(pv)
+                else:
+                    SETTINGS["proactivity"][pk] = pv
+        else:
+            SETTINGS[k] = v
+
 def load_settings():
-    global SETTINGS
-    if os.path.exists(SETTINGS_FILE):
-        try:
-            with open(SETTINGS_FILE, 'r') as f:
-                loaded = json.load(f)
-                # Merge with defaults to ensure new keys exist
-                # Deep merge for tool_permissions would be better but shallow merge of top keys + tool_permissions check is okay for now
-                for k, v in loaded.items():
-                    if k == "tool_permissions" and isinstance(v, dict):
-                         SETTINGS["tool_permissions"].update(v)
-                    elif k == "proactivity" and isinstance(v, dict):
-                        for pk, pv in v.items():
-                            if pk == "idle_nudges" and isinstance(pv, dict):
-                                SETTINGS["proactivity"]["idle_nudges"].update(pv)
-                            else:
-                                SETTINGS["proactivity"][pk] = pv
-                    else:
-                        SETTINGS[k] = v
+    try:
+        loaded = settings_service.get()
+        if loaded:
+            _merge_settings(loaded)
             print(f"Loaded settings: {SETTINGS}")
-        except Exception as e:
-            print(f"Error loading settings: {e}")
+    except Exception as e:
+        print(f"Error loading settings: {e}")
 
 def save_settings():
     try:
-        with open(SETTINGS_FILE, 'w') as f:
-            json.dump(SETTINGS, f, indent=4)
+        # Atomic write; also refreshes the shared cache and notifies subscribers (e.g. capture settings)
+        settings_service.save(SETTINGS)
         print("Settings saved.")
     except Exception as e:
         print(f"Error saving settings: {e}")
 
-# Load on startup
+# Load on startup, then follow manual edits of settings.json
 load_settings()
+settings_service.subscribe(_merge_settings)
 
 authenticator = None
 kasa_agent = KasaAgent(known_devices=SETTINGS.get("kasa_devices"))
@@ -482,6 +543,18 @@ async def status():
     return {"status": "running", "service": "MonikAI Backend"}
 
 
+@app.get("/metrics")
+async def metrics():
+    if not audio_loop:
+        return {"running": False}
+    return {
+        "running": True,
+        "latency": audio_loop.get_latency_metrics(),
+        "outbound": audio_loop.get_outbound_stats(),
+        "image_encoding": audio_loop.get_encoder_stats(),
+    }
+
+
 @app.get("/study/catalog")
 async def study_catalog():
     if not STUDY_DIR.exists():
@@ -622,11 +695,13 @@ async def start_audio(sid, data=None):
             return
 
 
-    # Callback to send audio data to frontend
+    # Callback to send audio data to frontend (called with each block as it is played)
+    visualizer = VisualizerFeed(VisualizerConfig.from_settings(SETTINGS), monikai.RECEIVE_SAMPLE_RATE)
+
     def on_audio_data(data_bytes):
-        # We need to schedule this on the event loop
-        # This is high frequency, so we might want to downsample or batch if it's too much
-        asyncio.create_task(sio.emit('audio_data', {'data': list(data_bytes)}))
+        payload = visualizer.push(data_bytes, time.monotonic())
+        if payload is not None:
+            asyncio.create_task(sio.emit('audio_data', payload))
 
     # Callback to send Browser data to frontend
     def on_web_data(data):
@@ -734,14 +809,6 @@ async def start_audio(sid, data=None):
         except Exception as e:
             print(f"[SERVER] Failed to emit reminder_fired: {e}")
 
-    # Callback for Calendar data
-    def on_calendar_update(events):
-        try:
-            print(f"[SERVER] Emitting calendar_data with {len(events)} events.")
-            asyncio.create_task(sio.emit('calendar_data', events))
-        except Exception as e:
-            print(f"[SERVER] Failed to emit calendar_data: {e}")
-
     # Callback for Personality data
     def on_personality_update(data):
         try:
@@ -810,7 +877,7 @@ async def start_audio(sid, data=None):
             on_error=on_error,
             on_reminder_fired=on_reminder_fired,
             on_reminders_updated=on_reminders_updated,
-            on_calendar_update=on_calendar_update,
+            on_calendar_update=_emit_calendar_update,
             on_personality_update=on_personality_update,
             on_internal_thought=on_internal_thought,
             on_study_fields=on_study_fields,
@@ -908,6 +975,18 @@ async def resume_audio(sid):
         print("[SYSTEM NOTIFICATION] Audio Resumed")
         await sio.emit('status', {'msg': 'Audio Resumed'})
 
+@sio.event
+async def get_latency_metrics(sid):
+    """Per-turn voice latency percentiles (ms from the user's last voiced chunk)."""
+    metrics = audio_loop.get_latency_metrics() if audio_loop else {}
+    await sio.emit('latency_metrics', metrics, room=sid)
+
+@sio.event
+async def get_outbound_stats(sid):
+    """Per-lane depth and enqueue/send/drop counters of the realtime send queue."""
+    stats = audio_loop.get_outbound_stats() if audio_loop else {}
+    await sio.emit('outbound_stats', stats, room=sid)
+
 
 # --------------------------------------------------------------------------------------
 # Reminders API (frontend-driven list/cancel; creation optional)
@@ -934,6 +1013,7 @@ def _serialize_reminders():
             'when_epoch_ms': when_epoch_ms,
             'alert': bool(getattr(r, 'alert', True)),
             'created_iso': getattr(r, 'created_iso', None),
+            'recurrence': getattr(r, 'recurrence', None),
         })
     # Sort by scheduled time
     result.sort(key=lambda x: (x['when_epoch_ms'] is None, x['when_epoch_ms'] or 0))
@@ -1074,11 +1154,11 @@ async def list_reminders(sid, data=None):
 
 @sio.event
 async def list_calendar(sid, data=None):
-    """Frontend requests current calendar events."""
-    events = []
+    """Frontend requests the current calendar snapshot (on mount, or after a delta version gap)."""
+    snapshot = {'version': 0, 'events': []}
     if calendar_manager:
-        events = [e.__dict__ for e in calendar_manager.get_all_events()]
-    await sio.emit('calendar_data', events, room=sid)
+        snapshot = calendar_manager.snapshot()
+    await sio.emit('calendar_data', snapshot, room=sid)
 
 @sio.event
 async def get_personality_status(sid):
@@ -1108,10 +1188,8 @@ async def update_event(sid, data):
     eid = data.get('id')
     summary = data.get('summary')
     if calendar_manager and eid:
+        # The manager broadcasts the change as a calendar_delta
         calendar_manager.update_event(eid, summary=summary)
-        # emit calendar_data
-        events = [e.__dict__ for e in calendar_manager.get_all_events()]
-        await sio.emit('calendar_data', events, room=sid)
 
 @sio.event
 async def cancel_reminder(sid, data):
@@ -1147,13 +1225,14 @@ async def create_reminder(sid, data):
     in_seconds = data.get('in_seconds')
     speak = data.get('speak', True)
     alert = data.get('alert', True)
+    recurrence = data.get('recurrence')
 
     if not message:
         await sio.emit('error', {'msg': 'create_reminder: Missing message'}, room=sid)
         return
 
     try:
-        rem = reminder_manager.create(message=message, at=at, in_minutes=in_minutes, in_seconds=in_seconds, speak=speak, alert=alert)
+        rem = reminder_manager.create(message=message, at=at, in_minutes=in_minutes, in_seconds=in_seconds, speak=speak, alert=alert, recurrence=recurrence)
         await sio.emit('status', {'msg': f"Reminder created ({rem.id})"}, room=sid)
 
         # Let the model know (so it can reference it later)
@@ -1195,16 +1274,11 @@ async def create_event(sid, data):
         return
 
     try:
-        event = calendar_manager.create_event(summary=summary, start_iso=start_iso, end_iso=end_iso, description=description)
+        event = calendar_manager.create_event(summary=summary, start_iso=start_iso, end_iso=end_iso, description=description, recurrence=data.get('recurrence'))
         await sio.emit('status', {'msg': f"Event created ({event.id})"}, room=sid)
     except Exception as e:
         await sio.emit('error', {'msg': f"Failed to create event: {e}"}, room=sid)
 
-    # Emit update
-    if calendar_manager:
-        events = [e.__dict__ for e in calendar_manager.get_all_events()]
-        await sio.emit('calendar_data', events, room=sid)
-
 @sio.event
 async def confirm_tool(sid, data):
     # data: { "id": "...", "confirmed": True/False }
@@ -1,19 +1,56 @@
+import contextlib
 import json
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
 import time
-from datetime import datetime
+import zipfile
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, Iterator, List, Dict, Optional, Union
+
+
+_DAY_DIR_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# Gaps between consecutive turns longer than this do not count as active time
+STATS_ACTIVE_GAP_SEC = 300.0
+_USER_SENDERS = ("Ty", "User")
+_AI_SENDERS = ("AI", "Monika")
 
 
 class SessionManager:
-    """Global session manager (no projects)."""
+    """
+    Global session manager (no projects) with an FTS index over all turns.
 
-    def __init__(self, workspace_root: Path):
+    Day directories older than `archive_after_days` are packed into one zip per month
+    (sessions/archive/YYYY-MM.zip); readers fall back to those archives transparently.
+    """
+
+    def __init__(self, workspace_root: Path, archive_after_days: Optional[int] = None):
         self.workspace_root = Path(workspace_root)
         self.sessions_dir = self.workspace_root / "sessions"
         self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        self.archive_dir = self.sessions_dir / "archive"
+        self.history_db_path = self.sessions_dir / "history.db"
         self.current_session_id: Optional[str] = None
         self.current_session_path: Optional[Path] = None
+        # session_id -> (archive path, day, {file name: zip member})
+        self._archive_index: Optional[Dict[str, tuple]] = None
+
+        try:
+            self._ensure_history_schema()
+            self.backfill_history_index()
+        except Exception as e:
+            print(f"[SESSIONS] Failed to initialize history index: {e}")
+
+        if archive_after_days is not None:
+            try:
+                self.archive_old_sessions(older_than_days=archive_after_days)
+            except Exception as e:
+                print(f"[SESSIONS] Failed to archive old sessions: {e}")
+
         self.start_new_session()
 
     def start_new_session(self, session_id: Optional[str] = None) -> str:
@@ -56,14 +93,31 @@ class SessionManager:
         if self.current_session_id == session_id and self.current_session_path:
             return self.current_session_path
         # Search on disk
-        for day_dir in sorted(self.sessions_dir.iterdir(), reverse=True):
-            if not day_dir.is_dir():
-                continue
+        for day_dir in self._iter_day_dirs_desc():
             for sess_dir in sorted(day_dir.iterdir(), reverse=True):
                 if sess_dir.is_dir() and sess_dir.name == session_id:
                     return sess_dir
+        # Archived sessions are restored to the live tree so callers can write into them
+        if session_id in self._get_archive_index():
+            return self._restore_archived_session(session_id)
         return None
 
+    def read_session_file(self, session_id: str, name: str) -> Optional[str]:
+        """Read a file (meta.json, turns.jsonl, summary.md) of a live or archived session."""
+        if not session_id or not name:
+            return None
+        if self.current_session_id == session_id and self.current_session_path:
+            path = self.current_session_path / name
+            return path.read_text(encoding="utf-8", errors="ignore") if path.exists() else None
+        for day_dir in self._iter_day_dirs_desc():
+            path = day_dir / session_id / name
+            if path.exists():
+                return path.read_text(encoding="utf-8", errors="ignore")
+        return self._read_archived_file(session_id, name)
+
+    def get_session_summary(self, session_id: str) -> Optional[str]:
+        return self.read_session_file(session_id, "summary.md")
+
     def log_chat(self, sender: str, text: str) -> None:
         if not self.current_session_path:
             return
@@ -75,14 +129,29 @@ class SessionManager:
         }
         log_file = self.current_session_path / "turns.jsonl"
         with open(log_file, "a", encoding="utf-8") as f:
+            start = f.tell()
             f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            end = f.tell()
+
+        try:
+            with self._connect() as conn:
+                if self._get_indexed_offset(conn, log_file) == start:
+                    self._index_turn(conn, entry)
+                    self._update_stats(conn, entry)
+                    self._set_indexed_offset(conn, log_file, end)
+                else:
+                    # Index is behind this file (earlier failure); catch up from the stored offset
+                    if self._index_file(conn, log_file):
+                        self._rebuild_stats(conn)
+        except Exception as e:
+            print(f"[SESSIONS] Failed to index turn: {e}")
 
     def get_recent_chat_history(self, limit: int = 10) -> List[Dict]:
         """Return last N messages across recent sessions (newest first)."""
         results: List[Dict] = []
-        for turns_path in self._iter_turns_files_desc():
+        for read_turns in self._iter_turns_sources_desc():
             try:
-                lines = turns_path.read_text(encoding="utf-8", errors="ignore").splitlines()
+                lines = read_turns().splitlines()
             except Exception:
                 continue
 
@@ -99,18 +168,459 @@ class SessionManager:
 
         return list(reversed(results))
 
-    def _iter_turns_files_desc(self):
+    def _iter_day_dirs_desc(self):
         if not self.sessions_dir.exists():
             return []
-
-        day_dirs = [d for d in self.sessions_dir.iterdir() if d.is_dir()]
+        day_dirs = [d for d in self.sessions_dir.iterdir() if d.is_dir() and _DAY_DIR_RE.match(d.name)]
         day_dirs.sort(reverse=True)
+        return day_dirs
 
-        for day_dir in day_dirs:
+    def _iter_turns_files_desc(self):
+        for day_dir in self._iter_day_dirs_desc():
             sess_dirs = [d for d in day_dir.iterdir() if d.is_dir()]
             sess_dirs.sort(reverse=True)
             for sess_dir in sess_dirs:
                 turns = sess_dir / "turns.jsonl"
                 if turns.exists():
                     yield turns
-
+
+    def _iter_turns_sources_desc(self):
+        """Yield loaders for every turns.jsonl (live and archived), newest session first."""
+        sources = []
+        for turns in self._iter_turns_files_desc():
+            sources.append((turns.parent.parent.name, turns.parent.name, lambda p=turns: p.read_text(encoding="utf-8", errors="ignore")))
+        live_ids = {sid for _, sid, _ in sources}
+        for session_id, (_, day, members) in self._get_archive_index().items():
+            if session_id in live_ids or "turns.jsonl" not in members:
+                continue
+            sources.append((day, session_id, lambda sid=session_id: self._read_archived_file(sid, "turns.jsonl") or ""))
+        sources.sort(key=lambda s: (s[0], s[1]), reverse=True)
+        for _, _, loader in sources:
+            yield loader
+
+    # ------------------------------------------------------------------
+    # Archival (old day directories -> one zip per month)
+    # ------------------------------------------------------------------
+    def _get_archive_index(self) -> Dict[str, tuple]:
+        if self._archive_index is not None:
+            return self._archive_index
+        index: Dict[str, tuple] = {}
+        if self.archive_dir.exists():
+            for archive in sorted(self.archive_dir.glob("*.zip")):
+                try:
+                    with zipfile.ZipFile(archive) as zf:
+                        names = zf.namelist()
+                except Exception as e:
+                    print(f"[SESSIONS] Skipping unreadable archive {archive.name}: {e}")
+                    continue
+                # Members are laid out as YYYY-MM-DD/<session_id>/<file>
+                for name in names:
+                    parts = name.split("/")
+                    if len(parts) != 3:
+                        continue
+                    day, session_id, fname = parts
+                    entry = index.setdefault(session_id, (archive, day, {}))
+                    entry[2][fname] = name
+        self._archive_index = index
+        return index
+
+    def _read_archived_file(self, session_id: str, name: str) -> Optional[str]:
+        entry = self._get_archive_index().get(session_id)
+        if not entry or name not in entry[2]:
+            return None
+        archive, _, members = entry
+        # The zip central directory holds each member's offset, so this is a single seek + inflate
+        with zipfile.ZipFile(archive) as zf:
+            return zf.read(members[name]).decode("utf-8", errors="ignore")
+
+    def _rewrite_archive(self, archive: Path, add: Dict[str, Path], drop_prefix: Optional[str] = None) -> None:
+        """Atomically rebuild `archive` with `add` (arcname -> file) merged in and `drop_prefix` removed."""
+        archive.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=archive.stem + ".", suffix=".tmp", dir=str(archive.parent))
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp_name, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as out:
+                if archive.exists():
+                    with zipfile.ZipFile(archive) as old:
+                        for info in old.infolist():
+                            if info.filename in add:
+                                continue
+                            if drop_prefix and info.filename.startswith(drop_prefix):
+                                continue
+                            out.writestr(info, old.read(info))
+                for arcname, path in sorted(add.items()):
+                    out.write(path, arcname)
+            os.replace(tmp_name, archive)
+        except Exception:
+            try:
+                os.remove(tmp_name)
+            except OSError:
+                pass
+            raise
+
+    def archive_old_sessions(self, older_than_days: int = 30) -> int:
+        """Pack day directories older than N days into sessions/archive/YYYY-MM.zip. Returns days archived."""
+        cutoff = (datetime.now() - timedelta(days=max(0, int(older_than_days)))).strftime("%Y-%m-%d")
+        by_month: Dict[str, List[Path]] = {}
+        for day_dir in self._iter_day_dirs_desc():
+            if day_dir.name >= cutoff:
+                continue
+            if self.current_session_path and self.current_session_path.parent == day_dir:
+                continue
+            by_month.setdefault(day_dir.name[:7], []).append(day_dir)
+
+        archived = 0
+        for month, day_dirs in sorted(by_month.items()):
+            add: Dict[str, Path] = {}
+            for day_dir in day_dirs:
+                for path in day_dir.rglob("*"):
+                    if path.is_file():
+                        add[path.relative_to(self.sessions_dir).as_posix()] = path
+            if add:
+                self._rewrite_archive(self.archive_dir / f"{month}.zip", add)
+            self._archive_index = None
+            for day_dir in day_dirs:
+                shutil.rmtree(day_dir, ignore_errors=True)
+                archived += 1
+        return archived
+
+    def _restore_archived_session(self, session_id: str) -> Optional[Path]:
+        entry = self._get_archive_index().get(session_id)
+        if not entry:
+            return None
+        archive, day, members = entry
+        session_path = self.sessions_dir / day / session_id
+        session_path.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(archive) as zf:
+            for fname, member in members.items():
+                (session_path / fname).write_bytes(zf.read(member))
+        # Live copy is now authoritative; it is re-archived with its day later
+        self._rewrite_archive(archive, {}, drop_prefix=f"{day}/{session_id}/")
+        self._archive_index = None
+        return session_path
+
+    # ------------------------------------------------------------------
+    # History index (SQLite FTS5 over turns.jsonl)
+    # ------------------------------------------------------------------
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """One transaction (committed on success, rolled back on error); always closed."""
+        conn = sqlite3.connect(self.history_db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _ensure_history_schema(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS turns (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT,
+                    sender TEXT,
+                    text TEXT NOT NULL,
+                    ts REAL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_turns_ts ON turns(ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_turns_session ON turns(session_id)")
+            conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(
+                    text,
+                    sender,
+                    content='turns',
+                    content_rowid='id'
+                )
+                """
+            )
+            # Byte offset already indexed for each turns.jsonl (incremental backfill)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS indexed_files (
+                    path TEXT PRIMARY KEY,
+                    offset INTEGER NOT NULL
+                )
+                """
+            )
+            # Incremental counters: scope is 'session', 'day' (YYYY-MM-DD) or 'week' (YYYY-Www)
+            stats_exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats'"
+            ).fetchone()
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS stats (
+                    scope TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    turns INTEGER NOT NULL DEFAULT 0,
+                    user_turns INTEGER NOT NULL DEFAULT 0,
+                    ai_turns INTEGER NOT NULL DEFAULT 0,
+                    other_turns INTEGER NOT NULL DEFAULT 0,
+                    words INTEGER NOT NULL DEFAULT 0,
+                    chars INTEGER NOT NULL DEFAULT 0,
+                    active_sec REAL NOT NULL DEFAULT 0,
+                    first_ts REAL,
+                    last_ts REAL,
+                    PRIMARY KEY (scope, key)
+                ) WITHOUT ROWID
+                """
+            )
+            if not stats_exists:
+                self._rebuild_stats(conn)
+
+    def _file_key(self, turns_path: Path) -> str:
+        try:
+            return Path(turns_path).relative_to(self.sessions_dir).as_posix()
+        except ValueError:
+            return str(turns_path)
+
+    def _get_indexed_offset(self, conn: sqlite3.Connection, turns_path: Path) -> int:
+        row = conn.execute("SELECT offset FROM indexed_files WHERE path = ?", (self._file_key(turns_path),)).fetchone()
+        return int(row["offset"]) if row else 0
+
+    def _set_indexed_offset(self, conn: sqlite3.Connection, turns_path: Path, offset: int) -> None:
+        conn.execute(
+            "INSERT INTO indexed_files(path, offset) VALUES (?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET offset = excluded.offset",
+            (self._file_key(turns_path), int(offset)),
+        )
+
+    def _index_turn(self, conn: sqlite3.Connection, entry: Dict[str, Any]) -> None:
+        text = str(entry.get("text") or "").strip()
+        if not text:
+            return
+        sender = str(entry.get("sender") or "")
+        try:
+            ts = float(entry.get("timestamp") or 0.0)
+        except (TypeError, ValueError):
+            ts = 0.0
+        cur = conn.execute(
+            "INSERT INTO turns(session_id, sender, text, ts) VALUES (?, ?, ?, ?)",
+            (entry.get("session_id"), sender, text, ts),
+        )
+        conn.execute(
+            "INSERT INTO turns_fts(rowid, text, sender) VALUES (?, ?, ?)",
+            (cur.lastrowid, text, sender),
+        )
+
+    def _index_file(self, conn: sqlite3.Connection, turns_path: Path) -> int:
+        try:
+            size = turns_path.stat().st_size
+        except OSError:
+            return 0
+        offset = self._get_indexed_offset(conn, turns_path)
+        if offset > size:
+            # File was truncated/rewritten; reindex it from scratch
+            conn.execute("DELETE FROM turns_fts WHERE rowid IN (SELECT id FROM turns WHERE session_id = ?)", (turns_path.parent.name,))
+            conn.execute("DELETE FROM turns WHERE session_id = ?", (turns_path.parent.name,))
+            offset = 0
+        if offset == size:
+            return 0
+
+        with open(turns_path, "rb") as f:
+            f.seek(offset)
+            chunk = f.read(size - offset)
+
+        # Only consume complete lines; a partial trailing line is picked up next time
+        end = chunk.rfind(b"\n")
+        if end == -1:
+            return 0
+
+        added = 0
+        for raw in chunk[: end + 1].splitlines():
+            if not raw.strip():
+                continue
+            try:
+                entry = json.loads(raw.decode("utf-8", errors="ignore"))
+            except Exception:
+                continue
+            if not entry.get("session_id"):
+                entry["session_id"] = turns_path.parent.name
+            self._index_turn(conn, entry)
+            added += 1
+        self._set_indexed_offset(conn, turns_path, offset + end + 1)
+        return added
+
+    def backfill_history_index(self) -> int:
+        """Index turns written to disk but not yet in the FTS index. Returns the number of turns added."""
+        added = 0
+        with self._connect() as conn:
+            for turns_path in self._iter_turns_files_desc():
+                added += self._index_file(conn, turns_path)
+            if added:
+                # Backfill walks sessions newest-first; recompute counters in time order
+                self._rebuild_stats(conn)
+        return added
+
+    # ------------------------------------------------------------------
+    # Statistics (incremental per-session / day / week rollups)
+    # ------------------------------------------------------------------
+    def _update_stats(self, conn: sqlite3.Connection, entry: Dict[str, Any]) -> None:
+        text = str(entry.get("text") or "").strip()
+        if not text:
+            return
+        sender = str(entry.get("sender") or "")
+        try:
+            ts = float(entry.get("timestamp") or 0.0)
+        except (TypeError, ValueError):
+            ts = 0.0
+        if not ts:
+            return
+
+        local = datetime.fromtimestamp(ts)
+        iso_year, iso_week, _ = local.isocalendar()
+        keys = [
+            ("session", str(entry.get("session_id") or "")),
+            ("day", local.strftime("%Y-%m-%d")),
+            ("week", f"{iso_year:04d}-W{iso_week:02d}"),
+        ]
+        is_user = 1 if sender in _USER_SENDERS else 0
+        is_ai = 1 if sender in _AI_SENDERS else 0
+        row = (1, is_user, is_ai, 1 - is_user - is_ai, len(text.split()), len(text), ts, ts)
+
+        for scope, key in keys:
+            if not key:
+                continue
+            conn.execute(
+                """
+                INSERT INTO stats(scope, key, turns, user_turns, ai_turns, other_turns, words, chars, active_sec, first_ts, last_ts)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
+                ON CONFLICT(scope, key) DO UPDATE SET
+                    turns = turns + excluded.turns,
+                    user_turns = user_turns + excluded.user_turns,
+                    ai_turns = ai_turns + excluded.ai_turns,
+                    other_turns = other_turns + excluded.other_turns,
+                    words = words + excluded.words,
+                    chars = chars + excluded.chars,
+                    active_sec = active_sec + CASE
+                        WHEN excluded.last_ts > last_ts AND excluded.last_ts - last_ts <= ?
+                        THEN excluded.last_ts - last_ts ELSE 0 END,
+                    first_ts = MIN(first_ts, excluded.first_ts),
+                    last_ts = MAX(last_ts, excluded.last_ts)
+                """,
+                (scope, key) + row + (STATS_ACTIVE_GAP_SEC,),
+            )
+
+    def _rebuild_stats(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM stats")
+        rows = conn.execute("SELECT session_id, sender, text, ts FROM turns ORDER BY ts").fetchall()
+        for r in rows:
+            self._update_stats(conn, {"session_id": r["session_id"], "sender": r["sender"], "text": r["text"], "timestamp": r["ts"]})
+
+    def _get_stats(self, scope: str, key: str) -> Dict[str, Any]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM stats WHERE scope = ? AND key = ?", (scope, key)).fetchone()
+        out = {
+            "scope": scope,
+            "key": key,
+            "turns": 0,
+            "user_turns": 0,
+            "ai_turns": 0,
+            "other_turns": 0,
+            "words": 0,
+            "chars": 0,
+            "active_minutes": 0.0,
+            "first_ts": None,
+            "last_ts": None,
+        }
+        if row:
+            for k in ("turns", "user_turns", "ai_turns", "other_turns", "words", "chars", "first_ts", "last_ts"):
+                out[k] = row[k]
+            out["active_minutes"] = round((row["active_sec"] or 0.0) / 60.0, 1)
+        return out
+
+    def get_session_stats(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        return self._get_stats("session", session_id or self.current_session_id or "")
+
+    def get_day_stats(self, day: Union[str, datetime, None] = None) -> Dict[str, Any]:
+        """Counters for a local day ('YYYY-MM-DD'; default today)."""
+        if not isinstance(day, str):
+            day = (day or datetime.now()).strftime("%Y-%m-%d")
+        return self._get_stats("day", day)
+
+    def get_week_stats(self, week: Union[str, datetime, None] = None) -> Dict[str, Any]:
+        """Counters for an ISO week ('YYYY-Www'; default current week)."""
+        if not isinstance(week, str):
+            iso_year, iso_week, _ = (week or datetime.now()).isocalendar()
+            week = f"{iso_year:04d}-W{iso_week:02d}"
+        return self._get_stats("week", week)
+
+    def _sanitize_query(self, query: str) -> str:
+        # Word tokens in any script (as unicode61 splits them), each as a quoted prefix
+        # term; OR-ed so natural-language queries match, bm25 ranks turns with more terms first
+        tokens = [t for t in re.findall(r"\w+", query or "") if t.strip("_")]
+        words = [t for t in tokens if len(t) > 1] or tokens
+        return " OR ".join(f'"{t}"*' for t in dict.fromkeys(words))
+
+    def _to_epoch(self, value: Union[str, float, int, datetime, None]) -> Optional[float]:
+        if value is None or value == "":
+            return None
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, datetime):
+            dt = value
+        else:
+            raw = str(value).strip().replace("Z", "+00:00")
+            try:
+                dt = datetime.fromisoformat(raw)
+            except ValueError:
+                return None
+        if dt.tzinfo is None:
+            dt = dt.astimezone()
+        return dt.timestamp()
+
+    def search_history(
+        self,
+        query: str,
+        since: Union[str, float, datetime, None] = None,
+        limit: int = 10,
+        until: Union[str, float, datetime, None] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Full-text search across all session transcripts.
+        `since`/`until` accept an ISO date/datetime (local time if naive) or epoch seconds.
+        Returns matches ordered by relevance.
+        """
+        q = self._sanitize_query(query)
+        if not q:
+            return []
+
+        sql = (
+            "SELECT t.session_id, t.sender, t.text, t.ts, "
+            "snippet(turns_fts, 0, '[', ']', '...', 16) AS snippet, bm25(turns_fts) AS rank "
+            "FROM turns_fts JOIN turns t ON t.id = turns_fts.rowid "
+            "WHERE turns_fts MATCH ?"
+        )
+        params: List[Any] = [q]
+
+        since_ts = self._to_epoch(since)
+        if since_ts is not None:
+            sql += " AND t.ts >= ?"
+            params.append(since_ts)
+        until_ts = self._to_epoch(until)
+        if until_ts is not None:
+            sql += " AND t.ts < ?"
+            params.append(until_ts)
+
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(max(1, int(limit)))
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        results = []
+        for r in rows:
+            ts = r["ts"] or 0.0
+            results.append({
+                "session_id": r["session_id"],
+                "sender": r["sender"],
+                "text": r["text"],
+                "snippet": r["snippet"],
+                "timestamp": ts,
+                "time_iso": datetime.fromtimestamp(ts).astimezone().isoformat(timespec="seconds") if ts else "",
+            })
+        return results
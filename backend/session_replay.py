@@ -0,0 +1,332 @@
+import asyncio
+import base64
+import contextlib
+import gzip
+import json
+import struct
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Record framing: <t: float64 seconds since start> <header length: u32> <blob length: u32>,
+# then the JSON header and the raw blob (PCM / JPEG bytes, empty for pure events).
+_FRAME = struct.Struct("<dII")
+
+MIC_RATE = 16000  # mic audio is recorded as sent, i.e. after resampling
+
+
+class SessionWriter:
+    """Appends timestamped records to a gzip-compressed recording file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = gzip.open(self.path, "wb", compresslevel=5)
+        self._t0 = time.monotonic()
+        self._lock = threading.Lock()
+
+    def write(self, header: Dict[str, Any], blob: bytes = b""):
+        head = json.dumps(header, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        with self._lock:
+            if self._f is None:
+                return
+            self._f.write(_FRAME.pack(time.monotonic() - self._t0, len(head), len(blob)))
+            self._f.write(head)
+            if blob:
+                self._f.write(blob)
+
+    def close(self):
+        with self._lock:
+            if self._f is not None:
+                self._f.close()
+                self._f = None
+
+
+def read_recording(path) -> Iterator[Tuple[float, Dict[str, Any], bytes]]:
+    """Yields (t, header, blob) records; a truncated tail (crash while recording) is ignored."""
+    with gzip.open(Path(path), "rb") as f:
+        while True:
+            try:
+                raw = f.read(_FRAME.size)
+                if len(raw) < _FRAME.size:
+                    return
+                t, head_len, blob_len = _FRAME.unpack(raw)
+                head = f.read(head_len)
+                blob = f.read(blob_len) if blob_len else b""
+            except (EOFError, OSError):
+                return
+            if len(head) < head_len or len(blob) < blob_len:
+                return
+            yield t, json.loads(head), blob
+
+
+# --------------------------------------------------------------------------------------
+# Recording
+# --------------------------------------------------------------------------------------
+def _response_to_record(response) -> Tuple[Dict[str, Any], bytes]:
+    """The subset of a LiveServerMessage that AudioLoop.receive_audio reads."""
+    header: Dict[str, Any] = {"dir": "in"}
+    blob = getattr(response, "data", None) or b""
+    sc = getattr(response, "server_content", None)
+    if sc is not None:
+        content: Dict[str, Any] = {}
+        for name in ("input_transcription", "output_transcription"):
+            tr = getattr(sc, name, None)
+            if tr is not None and getattr(tr, "text", None) is not None:
+                content[name] = tr.text
+        for flag in ("turn_complete", "interrupted", "generation_complete"):
+            if getattr(sc, flag, None):
+                content[flag] = True
+        header["server_content"] = content
+    tc = getattr(response, "tool_call", None)
+    if tc is not None:
+        header["tool_call"] = [
+            {"id": fc.id, "name": fc.name, "args": dict(fc.args or {})} for fc in (tc.function_calls or [])
+        ]
+    return header, bytes(blob)
+
+
+class RecordingSession:
+    """
+    Wraps a live session and records everything that crosses it: outbound mic audio,
+    frames and text (send), tool responses, and inbound server messages (receive).
+    Anything else is delegated to the wrapped session.
+    """
+
+    def __init__(self, session, writer: SessionWriter):
+        self._session = session
+        self._writer = writer
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    async def send(self, input=None, end_of_turn: bool = False, **kwargs):
+        header: Dict[str, Any] = {"dir": "out", "end_of_turn": bool(end_of_turn)}
+        blob = b""
+        if isinstance(input, dict) and "data" in input:
+            mime = str(input.get("mime_type", ""))
+            header["kind"] = "audio" if mime.startswith("audio/") else "image"
+            header["mime_type"] = mime
+            data = input["data"]
+            if isinstance(data, str):
+                header["b64"] = True
+                blob = base64.b64decode(data)
+            else:
+                blob = bytes(data)
+        else:
+            header["kind"] = "text"
+            header["text"] = input if isinstance(input, str) else str(input)
+        self._writer.write(header, blob)
+        return await self._session.send(input=input, end_of_turn=end_of_turn, **kwargs)
+
+    async def send_tool_response(self, function_responses=None, **kwargs):
+        responses = [
+            {"id": getattr(fr, "id", None), "name": getattr(fr, "name", None), "response": getattr(fr, "response", None)}
+            for fr in (function_responses or [])
+        ]
+        self._writer.write({"dir": "out", "kind": "tool_response", "responses": responses})
+        return await self._session.send_tool_response(function_responses=function_responses, **kwargs)
+
+    async def receive(self):
+        async for response in self._session.receive():
+            header, blob = _response_to_record(response)
+            self._writer.write(header, blob)
+            yield response
+
+
+@contextlib.asynccontextmanager
+async def recording(session, path):
+    """Records `session` to `path` for the duration of the block."""
+    writer = SessionWriter(path)
+    print(f"[AI DEBUG] [REPLAY] Recording session to {path}")
+    try:
+        yield RecordingSession(session, writer)
+    finally:
+        writer.close()
+
+
+# --------------------------------------------------------------------------------------
+# Replay
+# --------------------------------------------------------------------------------------
+def _record_to_response(header: Dict[str, Any], blob: bytes) -> SimpleNamespace:
+    """Rebuilds an object with the attributes receive_audio reads from LiveServerMessage."""
+    server_content = None
+    content = header.get("server_content")
+    if content is not None:
+        server_content = SimpleNamespace(
+            input_transcription=(
+                SimpleNamespace(text=content["input_transcription"]) if "input_transcription" in content else None
+            ),
+            output_transcription=(
+                SimpleNamespace(text=content["output_transcription"]) if "output_transcription" in content else None
+            ),
+            turn_complete=bool(content.get("turn_complete")),
+            interrupted=bool(content.get("interrupted")),
+            generation_complete=bool(content.get("generation_complete")),
+        )
+    tool_call = None
+    if header.get("tool_call") is not None:
+        tool_call = SimpleNamespace(
+            function_calls=[SimpleNamespace(id=c.get("id"), name=c.get("name"), args=c.get("args") or {}) for c in header["tool_call"]]
+        )
+    return SimpleNamespace(data=blob or None, server_content=server_content, tool_call=tool_call)
+
+
+class FakeLiveSession:
+    """
+    Local stand-in for a Live session that replays the server side of a recording.
+
+    receive() yields the recorded server messages at their original offsets (scaled by
+    `speed`), one turn per call like the real session. After a recorded tool call the
+    replay waits (up to `tool_timeout`) for send_tool_response, and later events shift
+    by the time spent waiting. send()/send_tool_response() only count what the client
+    sends; `done` is set once every recorded server message was delivered.
+    """
+
+    def __init__(self, path, speed: float = 1.0, tool_timeout: float = 10.0):
+        self.path = Path(path)
+        self.speed = max(0.01, float(speed))
+        self.tool_timeout = float(tool_timeout)
+        self._events: List[Tuple[float, Dict[str, Any], bytes]] = [
+            rec for rec in read_recording(self.path) if rec[1].get("dir") == "in"
+        ]
+        self._pos = 0
+        self._t0: Optional[float] = None
+        self._shift = 0.0
+        self._tool_responses = asyncio.Event()
+        self.done = asyncio.Event()
+        self.sent: Dict[str, Dict[str, int]] = {}
+        self.tool_responses: List[Any] = []
+        if not self._events:
+            self.done.set()
+
+    def _clock(self) -> float:
+        if self._t0 is None:
+            self._t0 = time.monotonic()
+        return time.monotonic() - self._t0
+
+    async def send(self, input=None, end_of_turn: bool = False, **kwargs):
+        self._clock()
+        if isinstance(input, dict) and "data" in input:
+            kind = "audio" if str(input.get("mime_type", "")).startswith("audio/") else "image"
+            size = len(input["data"] or b"")
+        else:
+            kind, size = "text", len(str(input or ""))
+        counter = self.sent.setdefault(kind, {"count": 0, "bytes": 0})
+        counter["count"] += 1
+        counter["bytes"] += size
+
+    async def send_tool_response(self, function_responses=None, **kwargs):
+        self.tool_responses.append(function_responses)
+        self._tool_responses.set()
+
+    async def receive(self):
+        while self._pos >= len(self._events):
+            # Like an idle live session: nothing more to say
+            await asyncio.Event().wait()
+        while self._pos < len(self._events):
+            t, header, blob = self._events[self._pos]
+            self._pos += 1
+            delay = (t / self.speed + self._shift) - self._clock()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            response = _record_to_response(header, blob)
+            if self._pos >= len(self._events):
+                self.done.set()
+            if response.tool_call is not None:
+                self._tool_responses.clear()
+            yield response
+            if response.tool_call is not None:
+                started = time.monotonic()
+                try:
+                    await asyncio.wait_for(self._tool_responses.wait(), self.tool_timeout)
+                except asyncio.TimeoutError:
+                    print("[AI DEBUG] [REPLAY] No tool response within timeout; continuing.")
+                self._shift += time.monotonic() - started
+            if response.server_content is not None and response.server_content.turn_complete:
+                return
+
+
+def fake_connect(path, speed: float = 1.0):
+    """Drop-in for client.aio.live.connect that serves a FakeLiveSession for `path`."""
+
+    @contextlib.asynccontextmanager
+    async def _connect(model=None, config=None):
+        yield FakeLiveSession(path, speed=speed)
+
+    return _connect
+
+
+class ReplayMicStream:
+    """
+    Blocking PyAudio-like input stream that plays back the mic audio of a recording at
+    real-time pace (16 kHz int16 mono). Gaps where nothing was sent upstream (silence
+    suppression, pauses) are filled with silence; after the end it keeps returning silence.
+    """
+
+    rate = MIC_RATE
+
+    def __init__(self, path, speed: float = 1.0):
+        self.speed = max(0.01, float(speed))
+        chunks = [
+            (t, blob)
+            for t, header, blob in read_recording(path)
+            if header.get("dir") == "out" and header.get("kind") == "audio"
+        ]
+        self._pcm = self._timeline(chunks)
+        self._pos = 0
+        self._t0: Optional[float] = None
+
+    @staticmethod
+    def _timeline(chunks: List[Tuple[float, bytes]]) -> bytes:
+        """
+        Rebuilds the capture timeline from send times. A chunk is sent right after it was
+        captured, so it ends at its record time; a pre-roll burst flushed at a speech onset
+        shares one record time, so walking backwards each chunk ends where the next one
+        starts instead of at the onset.
+        """
+        starts: List[int] = []
+        next_start: Optional[int] = None
+        for t, blob in reversed(chunks):
+            end = int(t * MIC_RATE)
+            if next_start is not None:
+                end = min(end, next_start)
+            next_start = max(0, end - len(blob) // 2)
+            starts.append(next_start)
+        starts.reverse()
+
+        pcm = bytearray()
+        for start, (_, blob) in zip(starts, chunks):
+            if start * 2 > len(pcm):
+                pcm.extend(bytes(start * 2 - len(pcm)))
+            pcm.extend(blob)
+        return bytes(pcm)
+
+    def read(self, frames: int, **kwargs) -> bytes:
+        if self._t0 is None:
+            self._t0 = time.monotonic()
+        n = frames * 2
+        due = self._t0 + (self._pos + n) / 2 / MIC_RATE / self.speed
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        chunk = self._pcm[self._pos:self._pos + n]
+        self._pos += n
+        return chunk + bytes(n - len(chunk))
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def null_speaker_write(sample_rate: int, speed: float = 1.0):
+    """write_fn for PlaybackEngine that discards audio but keeps device pacing."""
+
+    def _write(data: bytes):
+        time.sleep(len(data) / 2 / sample_rate / max(0.01, speed))
+
+    return _write
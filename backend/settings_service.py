@@ -0,0 +1,207 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BASE_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+SETTINGS_PATH = BASE_DIR.parent / "data" / "settings.json"
+
+_MISSING = object()
+
+
+class SettingsService:
+    """
+    Parsed, cached view of settings.json shared by the backend modules.
+
+    - get() returns the cached snapshot; the file is stat()ed at most once per
+      `check_interval` and only re-parsed when (mtime, size) changed, so hot paths
+      never open the file. A half-written file keeps the previous snapshot.
+    - save() writes atomically (temp file + os.replace) and updates the cache
+      immediately, so readers in this process never see stale values.
+    - `version` increases on every content change; subscribe() callbacks get the
+      new snapshot.
+
+    Snapshots are shared: treat them as read-only and write through save().
+    """
+
+    def __init__(self, path: Path = SETTINGS_PATH, check_interval: float = 1.0):
+        self.path = Path(path)
+        self.check_interval = float(check_interval)
+        self.version = 0
+        self._data: Dict[str, Any] = {}
+        self._stat_key: Optional[tuple] = None
+        self._next_check = 0.0
+        self._lock = threading.RLock()
+        self._subscribers: List[Callable[[], Optional[Callable[[dict], Any]]]] = []
+
+    # --- Snapshot ---
+    def get(self) -> dict:
+        now = time.monotonic()
+        if now < self._next_check:
+            return self._data
+        changed = False
+        with self._lock:
+            if now >= self._next_check:
+                self._next_check = now + self.check_interval
+                changed = self._refresh()
+            data = self._data
+        if changed:
+            self._notify(data)
+        return data
+
+    def _refresh(self) -> bool:
+        try:
+            st = os.stat(self.path)
+            key = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            key = None
+        if key == self._stat_key:
+            return False
+        if key is None:
+            data = {}
+        else:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if not isinstance(data, dict):
+                    data = {}
+            except Exception as e:
+                # Likely caught mid-write by another process; retry on the next check
+                print(f"[AI DEBUG] [SETTINGS] Failed to read settings: {e}")
+                return False
+        self._stat_key = key
+        if data == self._data:
+            return False
+        self._data = data
+        self.version += 1
+        return True
+
+    def invalidate(self):
+        """Forces the next get() to stat the file."""
+        self._next_check = 0.0
+
+    def save(self, data: dict, indent: int = 4):
+        """Atomically writes `data` and makes it the current snapshot."""
+        snapshot = json.loads(json.dumps(data))
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(prefix=self.path.stem + ".", suffix=".tmp", dir=str(self.path.parent))
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(snapshot, f, indent=indent)
+                os.replace(tmp_name, self.path)
+            except Exception:
+                try:
+                    os.remove(tmp_name)
+                except OSError:
+                    pass
+                raise
+            try:
+                st = os.stat(self.path)
+                self._stat_key = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                self._stat_key = None
+            self._next_check = time.monotonic() + self.check_interval
+            changed = snapshot != self._data
+            if changed:
+                self._data = snapshot
+                self.version += 1
+        if changed:
+            self._notify(snapshot)
+
+    # --- Typed accessors (dotted paths, e.g. "time_settings.mode") ---
+    def lookup(self, path: str, default: Any = None) -> Any:
+        node: Any = self.get()
+        for part in path.split("."):
+            if not isinstance(node, dict):
+                return default
+            node = node.get(part, _MISSING)
+            if node is _MISSING:
+                return default
+        return node
+
+    def section(self, path: str) -> dict:
+        value = self.lookup(path)
+        return value if isinstance(value, dict) else {}
+
+    def get_bool(self, path: str, default: bool = False) -> bool:
+        value = self.lookup(path, default)
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        return bool(value)
+
+    def get_int(self, path: str, default: int, low: Optional[int] = None, high: Optional[int] = None) -> int:
+        try:
+            value = int(self.lookup(path, default))
+        except (TypeError, ValueError):
+            value = default
+        if low is not None:
+            value = max(low, value)
+        if high is not None:
+            value = min(high, value)
+        return value
+
+    def get_float(self, path: str, default: float, low: Optional[float] = None, high: Optional[float] = None) -> float:
+        try:
+            value = float(self.lookup(path, default))
+        except (TypeError, ValueError):
+            value = default
+        if low is not None:
+            value = max(low, value)
+        if high is not None:
+            value = min(high, value)
+        return value
+
+    def get_str(self, path: str, default: str = "") -> str:
+        value = self.lookup(path, default)
+        return default if value is None else str(value)
+
+    # --- Change subscriptions ---
+    def subscribe(self, callback: Callable[[dict], Any]) -> Callable[[], None]:
+        """
+        Registers callback(snapshot) for content changes; returns an unsubscribe function.
+        Bound methods are held weakly, so a discarded owner does not linger as a subscriber.
+        """
+        if hasattr(callback, "__self__") and hasattr(callback, "__func__"):
+            ref = weakref.WeakMethod(callback)
+        else:
+            ref = lambda: callback
+        with self._lock:
+            self._subscribers.append(ref)
+
+        def _unsubscribe():
+            with self._lock:
+                if ref in self._subscribers:
+                    self._subscribers.remove(ref)
+
+        return _unsubscribe
+
+    def _notify(self, data: dict):
+        with self._lock:
+            self._subscribers = [ref for ref in self._subscribers if ref() is not None]
+            subscribers = [ref() for ref in self._subscribers]
+        for callback in subscribers:
+            if callback is None:
+                continue
+            try:
+                callback(data)
+            except Exception as e:
+                print(f"[AI DEBUG] [SETTINGS] Subscriber failed: {e}")
+
+
+_services: Dict[Path, SettingsService] = {}
+_services_lock = threading.Lock()
+
+
+def get_settings_service(path: Path = SETTINGS_PATH) -> SettingsService:
+    """Process-wide service per settings file, so monikai.py and server.py share one cache."""
+    key = Path(path).resolve()
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = SettingsService(key)
+        return service
@@ -55,6 +55,21 @@ function AppContent() {
     return Math.sqrt(sum / arr.length);
   };
 
+  // int16 PCM -> per-bin RMS levels (0..255, -60..0 dBFS), matching the backend envelope
+  const pcmToLevels = (buf, bins) => {
+    const bytes = buf instanceof ArrayBuffer ? new Uint8Array(buf) : new Uint8Array(buf.buffer, buf.byteOffset, buf.byteLength);
+    const samples = new Int16Array(bytes.slice(0, bytes.byteLength & ~1).buffer);
+    const levels = new Uint8Array(bins);
+    const perBin = Math.max(1, Math.floor(samples.length / bins));
+    for (let b = 0; b < bins && (b + 1) * perBin <= samples.length; b++) {
+      let sum = 0;
+      for (let i = b * perBin; i < (b + 1) * perBin; i++) sum += samples[i] * samples[i];
+      const db = 20 * Math.log10(Math.max(Math.sqrt(sum / perBin), 1) / 32768);
+      levels[b] = Math.max(0, Math.min(255, Math.round((db + 60) * (255 / 60))));
+    }
+    return levels;
+  };
+
   // ---------------------------------------------------------------------
   // Viewport (for fullscreen VN Visualizer)
   // ---------------------------------------------------------------------
@@ -278,6 +293,7 @@ function AppContent() {
   const [isCameraFlipped, setIsCameraFlipped] = useState(false);
   const [visionMode, setVisionMode] = useState(() => localStorage.getItem('video_mode') || 'none');
   const [visionFrame, setVisionFrame] = useState(null);
+  const [visionTiles, setVisionTiles] = useState(null);
 
   // Web Audio Context for Mic Visualization
   const audioContextRef = useRef(null);
@@ -1172,11 +1188,20 @@ function AppContent() {
     });
 
     socket.on('audio_data', (data) => {
-      setAiAudioData(data.data);
+      if (!data || !data.data) return;
+      // Binary payloads: 'envelope' is one level byte per bin, 'pcm' is raw int16
+      if (data.mode === 'pcm') {
+        setAiAudioData(pcmToLevels(data.data, 64));
+      } else {
+        setAiAudioData(new Uint8Array(data.data));
+      }
     });
 
     socket.on('vision_frame', (data) => {
-      if (data && data.data) {
+      if (data && data.tiles) {
+        // Incremental screen update: only the tiles that changed since the last frame
+        setVisionTiles(data);
+      } else if (data && data.data) {
         setVisionFrame(data);
       }
     });
@@ -2065,6 +2090,7 @@ function AppContent() {
         {visionMode === 'screen' && (
           <ScreenWindow
             imageSrc={visionFrame}
+            tileUpdate={visionTiles}
             onClose={toggleScreenCapture}
             position={elementPositions.screen}
             onMouseDown={(e) => handleMouseDown(e, 'screen')}
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect, useMemo, useRef } from 'react';
 import { X, Calendar, Clock, Bell, Plus, Trash2, RefreshCw, ChevronLeft, ChevronRight, AlignLeft, Check, AlertCircle, Mic, MapPin, Edit2 } from 'lucide-react';
 import { useLanguage } from '../contexts/LanguageContext';
 
@@ -13,6 +13,7 @@ const RemindersWindow = ({ socket, onClose, position, onMouseDown, activeDragEle
   const [currentDate, setCurrentDate] = useState(new Date()); // For calendar view navigation
   const [selectedDate, setSelectedDate] = useState(new Date());
   const [editingItem, setEditingItem] = useState(null); // { id, type, text }
+  const calendarVersion = useRef(null);
 
   // Form State
   const [formData, setFormData] = useState({
@@ -30,14 +31,40 @@ const RemindersWindow = ({ socket, onClose, position, onMouseDown, activeDragEle
     socket.emit('list_calendar');
 
     const onRemindersList = (data) => setReminders(data.reminders || []);
-    const onCalendarData = (data) => setEvents(data || []);
+    const onCalendarData = (data) => {
+      // Full snapshot: { version, events } (older backends sent a bare array)
+      if (Array.isArray(data)) {
+        calendarVersion.current = null;
+        setEvents(data);
+        return;
+      }
+      calendarVersion.current = data?.version ?? null;
+      setEvents(data?.events || []);
+    };
+    const onCalendarDelta = (delta) => {
+      if (calendarVersion.current === null || delta.reset || delta.version !== calendarVersion.current + 1) {
+        // Missed an update (or server asked for a reset): resync from a snapshot
+        socket.emit('list_calendar');
+        return;
+      }
+      calendarVersion.current = delta.version;
+      setEvents(prev => {
+        const byId = new Map(prev.map(e => [e.id, e]));
+        (delta.removed || []).forEach(id => byId.delete(id));
+        (delta.added || []).forEach(e => byId.set(e.id, e));
+        (delta.updated || []).forEach(e => byId.set(e.id, e));
+        return Array.from(byId.values());
+      });
+    };
 
     socket.on('reminders_list', onRemindersList);
     socket.on('calendar_data', onCalendarData);
+    socket.on('calendar_delta', onCalendarDelta);
 
     return () => {
       socket.off('reminders_list', onRemindersList);
       socket.off('calendar_data', onCalendarData);
+      socket.off('calendar_delta', onCalendarDelta);
     };
   }, [socket]);
 
@@ -1,9 +1,10 @@
-import React, { useState } from 'react';
+import React, { useCallback, useEffect, useRef, useState } from 'react';
 import { Monitor, X, Minus } from 'lucide-react';
 import { useLanguage } from '../contexts/LanguageContext';
 
 const ScreenWindow = ({ 
     imageSrc, 
+    tileUpdate,
     onClose, 
     position, 
     onMouseDown, 
@@ -12,6 +13,74 @@ const ScreenWindow = ({
 }) => {
     const { t } = useLanguage();
     const [isMinimized, setIsMinimized] = useState(false);
+    const canvasRef = useRef(null);
+
+    // Arrival order of keyframes and tile updates. A keyframe decodes asynchronously, so
+    // tiles received meanwhile are queued until it has been painted, and nothing older
+    // than what is already on the canvas is drawn over it.
+    const seqRef = useRef(0);
+    const keyframeSeqRef = useRef(0);
+    const pendingKeyframeRef = useRef(0);
+    const queuedTilesRef = useRef([]);
+    const tileSeqRef = useRef(new Map());
+
+    const drawTiles = useCallback((update, seq) => {
+        const canvas = canvasRef.current;
+        if (!canvas) return;
+        if (canvas.width !== update.width || canvas.height !== update.height) return;
+        update.tiles.forEach((tile) => {
+            createImageBitmap(new Blob([tile.data], { type: update.mime_type || 'image/jpeg' }))
+                .then((bitmap) => {
+                    const key = `${tile.x},${tile.y}`;
+                    if (seq > keyframeSeqRef.current && seq > (tileSeqRef.current.get(key) || 0)) {
+                        canvas.getContext('2d').drawImage(bitmap, tile.x, tile.y);
+                        tileSeqRef.current.set(key, seq);
+                    }
+                    bitmap.close();
+                })
+                .catch(() => {});
+        });
+    }, []);
+
+    // Full frames replace the canvas; tile updates repaint only the regions that changed
+    useEffect(() => {
+        if (!imageSrc) return;
+        const seq = ++seqRef.current;
+        pendingKeyframeRef.current = seq;
+        const img = new Image();
+        img.onload = () => {
+            // A newer keyframe arrived while this one was decoding
+            if (pendingKeyframeRef.current !== seq) return;
+            pendingKeyframeRef.current = 0;
+            const canvas = canvasRef.current;
+            if (!canvas) return;
+            canvas.width = img.naturalWidth;
+            canvas.height = img.naturalHeight;
+            canvas.getContext('2d').drawImage(img, 0, 0);
+            keyframeSeqRef.current = seq;
+            tileSeqRef.current.clear();
+            const queued = queuedTilesRef.current;
+            queuedTilesRef.current = [];
+            queued.forEach(([update, tileSeq]) => drawTiles(update, tileSeq));
+        };
+        img.onerror = () => {
+            if (pendingKeyframeRef.current !== seq) return;
+            // The queued tiles are deltas against a frame that never got painted
+            pendingKeyframeRef.current = 0;
+            queuedTilesRef.current = [];
+        };
+        img.src = `data:${imageSrc.mime_type || 'image/jpeg'};base64,${imageSrc.data}`;
+    }, [imageSrc, drawTiles]);
+
+    useEffect(() => {
+        if (!tileUpdate) return;
+        const seq = ++seqRef.current;
+        if (pendingKeyframeRef.current) {
+            queuedTilesRef.current.push([tileUpdate, seq]);
+            return;
+        }
+        drawTiles(tileUpdate, seq);
+    }, [tileUpdate, drawTiles]);
 
     return (
         <div
@@ -52,10 +121,10 @@ const ScreenWindow = ({
             {/* Content */}
             <div className="relative flex-1 bg-black overflow-hidden flex items-center justify-center" style={{ display: isMinimized ? 'none' : 'flex', height: isMinimized ? 0 : 'auto' }}>
                 {imageSrc ? (
-                    <img
-                      src={`data:${imageSrc.mime_type || 'image/jpeg'};base64,${imageSrc.data}`}
+                    <canvas
+                      ref={canvasRef}
                       className="w-full h-full object-cover"
-                      alt="SCREEN"
+                      aria-label="SCREEN"
                     />
                 ) : (
                     <div className="flex flex-col items-center gap-2 text-white/30">
@@ -0,0 +1,69 @@
+import asyncio
+import subprocess
+import sys
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+import image_encoder
+from image_encoder import MAX_BROKEN_POOLS, EncodeService
+
+
+class _DeadPool(image_encoder.ProcessPoolExecutor):
+    """Process pool whose workers never come up."""
+
+    created = 0
+
+    def __init__(self, *args, **kwargs):
+        type(self).created += 1
+        super().__init__(*args, **kwargs)
+
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("worker failed to start")
+
+
+def test_falls_back_to_thread_after_repeated_broken_pools(monkeypatch):
+    monkeypatch.setattr(image_encoder, "ProcessPoolExecutor", _DeadPool)
+    frame = np.zeros((32, 48, 3), np.uint8)
+
+    async def run():
+        svc = EncodeService()
+        results = [await svc.encode(frame) for _ in range(MAX_BROKEN_POOLS + 2)]
+        stats = svc.stats()
+        svc.close()
+        return results, stats
+
+    results, stats = asyncio.run(run())
+    # One pool per failed attempt, then no more spawning
+    assert _DeadPool.created == MAX_BROKEN_POOLS
+    assert results[:MAX_BROKEN_POOLS] == [None] * MAX_BROKEN_POOLS
+    assert all(r is not None and r[0] == "image/jpeg" for r in results[MAX_BROKEN_POOLS:])
+    assert stats["processes"] is False
+    assert stats["failed"] == MAX_BROKEN_POOLS
+
+
+def test_workers_do_not_rerun_main(tmp_path):
+    # A __main__ with side effects, like server.py; spawn must not execute it in workers
+    log = tmp_path / "imports.log"
+    script = tmp_path / "main.py"
+    script.write_text(
+        "import asyncio, os, sys\n"
+        f"sys.path.insert(0, {str(Path(image_encoder.__file__).parent)!r})\n"
+        f"open({str(log)!r}, 'a').write(__name__ + '\\n')\n"
+        "import numpy as np\n"
+        "from image_encoder import EncodeService\n"
+        "async def go():\n"
+        "    svc = EncodeService(workers=2)\n"
+        "    out = await asyncio.gather(*[svc.encode(np.zeros((16, 16, 3), np.uint8)) for _ in range(2)])\n"
+        "    assert all(out) and svc.stats()['processes']\n"
+        "    svc.close()\n"
+        "if __name__ == '__main__':\n"
+        "    asyncio.run(go())\n",
+        encoding="utf-8",
+    )
+    subprocess.run([sys.executable, str(script)], check=True, timeout=120)
+    assert log.read_text(encoding="utf-8").split() == ["__main__"]
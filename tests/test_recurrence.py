@@ -0,0 +1,124 @@
+import os
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from recurrence import LOCAL_ZONE, describe_recurrence, iter_occurrences, parse_recurrence
+
+WARSAW = "Europe/Warsaw"
+
+
+def take(it, n):
+    return list(islice(it, n))
+
+
+def wall(dt):
+    return dt.astimezone(ZoneInfo(WARSAW)).strftime("%Y-%m-%d %H:%M")
+
+
+class TestDst:
+    def test_daily_keeps_local_time_across_spring_forward(self):
+        start = datetime.fromisoformat("2026-03-20T09:00:00+01:00")
+        occs = take(iter_occurrences(start, parse_recurrence("daily"), zone=WARSAW), 15)
+        assert [o.hour for o in occs] == [9] * 15
+        april_1 = occs[12]
+        assert april_1.isoformat() == "2026-04-01T09:00:00+02:00"
+
+    def test_daily_keeps_local_time_across_fall_back(self):
+        start = datetime.fromisoformat("2026-10-20T09:00:00+02:00")
+        occs = take(iter_occurrences(start, parse_recurrence("daily"), zone=WARSAW), 15)
+        assert {wall(o)[-5:] for o in occs} == {"09:00"}
+        assert occs[-1].utcoffset() == timedelta(hours=1)
+
+    def test_fixed_offset_without_zone_is_unchanged(self):
+        start = datetime.fromisoformat("2026-03-20T09:00:00+01:00")
+        occs = take(iter_occurrences(start, parse_recurrence("daily")), 13)
+        assert occs[12].isoformat() == "2026-04-01T09:00:00+01:00"
+
+    def test_skip_ahead_lands_on_local_time(self):
+        start = datetime.fromisoformat("2026-01-05T09:00:00+01:00")
+        after = datetime.fromisoformat("2026-07-01T00:00:00+02:00")
+        occ = next(iter_occurrences(start, parse_recurrence("daily"), after=after, zone=WARSAW))
+        assert occ.isoformat() == "2026-07-01T09:00:00+02:00"
+
+    def test_time_in_spring_forward_gap_moves_forward(self):
+        start = datetime.fromisoformat("2026-03-27T02:30:00+01:00")
+        occs = take(iter_occurrences(start, parse_recurrence("daily"), zone=WARSAW), 3)
+        # 2026-03-29 02:30 does not exist in Warsaw
+        assert wall(occs[2]) == "2026-03-29 03:30"
+
+    def test_hourly_steps_in_absolute_time(self):
+        start = datetime.fromisoformat("2026-03-29T00:00:00+01:00")
+        occs = take(iter_occurrences(start, parse_recurrence("hourly"), zone=WARSAW), 4)
+        assert [o.timestamp() - occs[0].timestamp() for o in occs] == [0, 3600, 7200, 10800]
+
+    def test_local_zone_uses_os_rules(self, monkeypatch):
+        if not hasattr(time, "tzset"):
+            pytest.skip("needs time.tzset")
+        monkeypatch.setenv("TZ", WARSAW)
+        time.tzset()
+        try:
+            start = datetime.fromisoformat("2026-03-20T09:00:00+01:00")
+            occs = take(iter_occurrences(start, parse_recurrence("daily"), zone=LOCAL_ZONE), 13)
+            assert occs[12].astimezone(ZoneInfo(WARSAW)).hour == 9
+        finally:
+            monkeypatch.delenv("TZ")
+            time.tzset()
+
+
+class TestByWeekday:
+    def test_weekdays_in_order_from_start(self):
+        start = datetime.fromisoformat("2026-03-25T18:00:00+01:00")  # Wednesday
+        rule = parse_recurrence("FREQ=WEEKLY;BYDAY=MO,WE,FR")
+        occs = take(iter_occurrences(start, rule, zone=WARSAW), 5)
+        assert [o.strftime("%a %d") for o in occs] == ["Wed 25", "Fri 27", "Mon 30", "Wed 01", "Fri 03"]
+        assert [wall(o)[-5:] for o in occs] == ["18:00"] * 5
+
+    def test_daily_byday_is_weekly(self):
+        rule = parse_recurrence("FREQ=DAILY;BYDAY=SA,SU")
+        assert rule == {"freq": "weekly", "interval": 1, "byweekday": [5, 6]}
+
+    def test_interval_skips_weeks(self):
+        start = datetime.fromisoformat("2026-03-02T10:00:00+01:00")  # Monday
+        rule = parse_recurrence("FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH")
+        occs = take(iter_occurrences(start, rule, zone=WARSAW), 4)
+        assert [o.day for o in occs] == [2, 5, 16, 19]
+
+    def test_rejects_byday_for_hourly(self):
+        with pytest.raises(ValueError):
+            parse_recurrence("FREQ=HOURLY;BYDAY=MO")
+
+
+class TestCountAndUntil:
+    def test_count_limits_series(self):
+        start = datetime.fromisoformat("2026-03-27T09:00:00+01:00")
+        occs = list(iter_occurrences(start, parse_recurrence("FREQ=DAILY;COUNT=5"), zone=WARSAW))
+        assert len(occs) == 5
+        assert occs[-1].isoformat() == "2026-03-31T09:00:00+02:00"
+
+    def test_count_is_counted_from_anchor_when_skipping(self):
+        start = datetime.fromisoformat("2026-03-23T09:00:00+01:00")  # Monday
+        rule = parse_recurrence("FREQ=WEEKLY;BYDAY=MO,FR;COUNT=5")
+        after = datetime.fromisoformat("2026-04-01T00:00:00+02:00")
+        occs = list(iter_occurrences(start, rule, after=after, zone=WARSAW))
+        # Mar 23, 27, 30 are before `after`; Apr 3 and 6 complete the five
+        assert [o.strftime("%m-%d") for o in occs] == ["04-03", "04-06"]
+
+    def test_until_is_inclusive(self):
+        start = datetime.fromisoformat("2026-03-27T09:00:00+01:00")
+        rule = parse_recurrence({"freq": "daily", "until": "2026-03-30T09:00:00+02:00"})
+        occs = list(iter_occurrences(start, rule, zone=WARSAW))
+        assert [o.day for o in occs] == [27, 28, 29, 30]
+
+    def test_until_basic_format_utc(self):
+        rule = parse_recurrence("FREQ=DAILY;UNTIL=20260330T070000Z")
+        start = datetime.fromisoformat("2026-03-27T09:00:00+01:00")
+        occs = list(iter_occurrences(start, rule, zone=WARSAW))
+        assert [o.day for o in occs] == [27, 28, 29, 30]
+
+    def test_describe(self):
+        rule = parse_recurrence("FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;COUNT=10")
+        assert describe_recurrence(rule) == "every 2 weeks on MO,WE, 10 times"
@@ -0,0 +1,146 @@
+import asyncio
+import gzip
+import importlib.util
+import json
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import session_replay
+from session_replay import MIC_RATE, FakeLiveSession, ReplayMicStream, read_recording, recording
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+
+
+def write_records(path, records):
+    """Writes (t, header, blob) records with explicit timestamps."""
+    with gzip.open(path, "wb") as f:
+        for t, header, blob in records:
+            head = json.dumps(header).encode("utf-8")
+            f.write(session_replay._FRAME.pack(t, len(head), len(blob)))
+            f.write(head)
+            f.write(blob)
+
+
+def mic(t, ms, value):
+    samples = MIC_RATE * ms // 1000
+    return (t, {"dir": "out", "kind": "audio", "mime_type": "audio/pcm"}, bytes([value, 0]) * samples)
+
+
+def server(t, blob=b"", **content):
+    return (t, {"dir": "in", "server_content": content}, blob)
+
+
+class TestReplayMicStream:
+    def test_preroll_burst_is_placed_before_onset(self, tmp_path):
+        # Three 100 ms pre-roll chunks flushed together with the onset chunk at t=2.0
+        rec = tmp_path / "rec.gz"
+        write_records(rec, [mic(2.0, 100, 1), mic(2.0, 100, 2), mic(2.0, 100, 3), mic(2.0, 100, 4), mic(2.1, 100, 5)])
+        pcm = ReplayMicStream(rec)._pcm
+        at = lambda sec: pcm[int(sec * MIC_RATE) * 2]
+        # The onset chunk ends at 2.0 s, the pre-roll precedes it
+        assert at(1.65) == 1
+        assert at(1.75) == 2
+        assert at(1.85) == 3
+        assert at(1.95) == 4
+        assert at(2.05) == 5
+        assert len(pcm) == int(2.1 * MIC_RATE) * 2
+
+    def test_gaps_are_silence(self, tmp_path):
+        rec = tmp_path / "rec.gz"
+        write_records(rec, [mic(0.1, 100, 1), mic(1.0, 100, 2)])
+        pcm = ReplayMicStream(rec)._pcm
+        assert pcm[int(0.5 * MIC_RATE) * 2] == 0
+        assert pcm[int(0.95 * MIC_RATE) * 2] == 2
+
+    def test_read_returns_silence_after_end(self, tmp_path):
+        rec = tmp_path / "rec.gz"
+        write_records(rec, [mic(0.01, 10, 7)])
+        stream = ReplayMicStream(rec, speed=100.0)
+        assert stream.read(160) == bytes([7, 0]) * 160
+        assert stream.read(160) == bytes(320)
+
+
+class _LiveStub:
+    def __init__(self, responses):
+        self._responses = responses
+        self.sent = []
+
+    async def send(self, input=None, end_of_turn=False):
+        self.sent.append(input)
+
+    async def send_tool_response(self, function_responses=None):
+        pass
+
+    async def receive(self):
+        for r in self._responses:
+            yield r
+
+
+class TestRecordAndReplay:
+    def test_round_trip(self, tmp_path):
+        rec = tmp_path / "session.gz"
+        responses = [
+            SimpleNamespace(
+                data=None,
+                server_content=SimpleNamespace(input_transcription=SimpleNamespace(text="hej"), output_transcription=None),
+                tool_call=None,
+            ),
+            SimpleNamespace(data=b"\x01\x02" * 10, server_content=None, tool_call=None),
+            SimpleNamespace(
+                data=None,
+                server_content=SimpleNamespace(input_transcription=None, output_transcription=None, turn_complete=True),
+                tool_call=None,
+            ),
+        ]
+
+        async def record():
+            async with recording(_LiveStub(responses), rec) as session:
+                await session.send(input={"data": b"\x00" * 320, "mime_type": "audio/pcm"})
+                await session.send(input="hello", end_of_turn=True)
+                return [r async for r in session.receive()]
+
+        asyncio.run(record())
+        kinds = [(h["dir"], h.get("kind")) for _, h, _ in read_recording(rec)]
+        assert kinds == [("out", "audio"), ("out", "text"), ("in", None), ("in", None), ("in", None)]
+
+        async def replay():
+            fake = FakeLiveSession(rec, speed=100.0)
+            await fake.send(input={"data": b"\x00" * 320, "mime_type": "audio/pcm"})
+            got = [r async for r in fake.receive()]
+            return fake, got
+
+        fake, got = asyncio.run(replay())
+        assert got[0].server_content.input_transcription.text == "hej"
+        assert got[1].data == b"\x01\x02" * 10
+        assert got[2].server_content.turn_complete
+        assert fake.done.is_set()
+        assert fake.sent == {"audio": {"count": 1, "bytes": 320}}
+
+
+def _missing_runtime_deps():
+    return [m for m in ("dotenv", "pyaudio", "google.genai", "PIL") if importlib.util.find_spec(m.split(".")[0]) is None]
+
+
+@pytest.mark.skipif(bool(_missing_runtime_deps()), reason="needs the backend runtime dependencies")
+def test_headless_replay_uses_isolated_data_dir(tmp_path):
+    rec = tmp_path / "session.gz"
+    chunks = [mic(0.1 * (i + 1), 100, 60) for i in range(10)]
+    write_records(rec, chunks + [server(1.2, b"\x00\x01" * 2400), server(1.4, turn_complete=True)])
+    data_dir = tmp_path / "data"
+    report_path = tmp_path / "report.json"
+
+    subprocess.run(
+        [sys.executable, "replay_runner.py", str(rec), "--data-dir", str(data_dir), "--timeout", "60", "--json", str(report_path)],
+        cwd=BACKEND,
+        check=True,
+        timeout=120,
+    )
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert report["sent"]["audio"]["count"] > 0
+    assert "spans_ms" in report["latency"]
+    # Everything the replay wrote went to the isolated directory
+    assert (data_dir / "sessions").is_dir()